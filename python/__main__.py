@@ -4,6 +4,14 @@
 # This code is DA Background Intellectual Property as defined in the
 # Master Product Agreement between DA and the client.
 
-from .main import main
+import sys
 
-main()
+from .daemon import daemon_enabled, forward
+
+if __name__ == "__main__":
+    if daemon_enabled() and sys.argv[1:2] != ["daemon"]:
+        sys.exit(forward(sys.argv[1:]))
+    else:
+        from .main import main
+
+        main()
@@ -0,0 +1,156 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+import threading
+
+from .snapshot import load_active_contracts
+from .value import format_tid
+
+
+def template_key(tid):
+    if isinstance(tid, str):
+        return tid
+    elif isinstance(tid, dict):
+        return format_tid(tid)
+    else:
+        return f"{tid.module_name}:{tid.entity_name}"
+
+
+def _stakeholders(contract):
+    return {p.party for p in contract["signatories"]} | {
+        p.party for p in contract["observers"]
+    }
+
+
+# Materialized view of the active contracts visible to one party. It is
+# seeded from a GetActiveContracts snapshot at a known offset and kept
+# current by applying the created and archived events from GetUpdates
+# after that offset. Contracts are indexed by contract id, by template
+# (format_tid key) and by stakeholder party id.
+class ActiveContractSet:
+    def __init__(self, ledger, party, template_ids=[]):
+        self.ledger = ledger
+        self.party = party
+        self.template_ids = template_ids
+
+        self.offset = None
+
+        self._lock = threading.Lock()
+        self._by_cid = {}
+        self._by_template = {}
+        self._by_party = {}
+
+    def _add(self, contract):
+        cid = contract["contract_id"]
+
+        tkey = template_key(contract["template_id"])
+
+        self._by_cid[cid] = contract
+        self._by_template.setdefault(tkey, {})[cid] = contract
+
+        for p in _stakeholders(contract):
+            self._by_party.setdefault(p, {})[cid] = contract
+
+    def _remove(self, cid):
+        contract = self._by_cid.pop(cid, None)
+
+        if contract is None:
+            return
+
+        self._by_template[template_key(contract["template_id"])].pop(cid, None)
+
+        for p in _stakeholders(contract):
+            self._by_party[p].pop(cid, None)
+
+    def load(self, *, parallel=False):
+        offset = self.ledger.get_ledger_end()
+
+        if parallel:
+            _, contracts = load_active_contracts(
+                self.ledger, self.party, self.template_ids, active_at_offset=offset
+            )
+        else:
+            contracts = self.ledger.get_active_contracts(
+                self.party, self.template_ids, active_at_offset=offset
+            )
+
+        with self._lock:
+            self._by_cid = {}
+            self._by_template = {}
+            self._by_party = {}
+
+            for c in contracts:
+                self._add(c)
+
+            self.offset = offset
+
+        return self
+
+    def apply(self, tx):
+        with self._lock:
+            if tx["offset"] <= self.offset:
+                return
+
+            for evt in tx["events"]:
+                if evt["event"] == "created":
+                    self._add(evt)
+                elif evt["event"] == "archived":
+                    self._remove(evt["contract_id"])
+
+            self.offset = tx["offset"]
+
+    def sync(self):
+        offset_end = self.ledger.get_ledger_end()
+
+        if offset_end > self.offset:
+            for tx in self.ledger._get_updates(
+                self.offset, offset_end, self.party, self.template_ids
+            ):
+                self.apply(tx)
+
+            with self._lock:
+                self.offset = max(self.offset, offset_end)
+
+        return self
+
+    def follow(self):
+        for tx in self.ledger._get_updates(
+            self.offset, None, self.party, self.template_ids
+        ):
+            self.apply(tx)
+            yield tx
+
+    def __len__(self):
+        return len(self._by_cid)
+
+    def get(self, cid):
+        return self._by_cid.get(cid)
+
+    def contracts(self, template=None, party=None, where=None):
+        with self._lock:
+            if template is not None and party is not None:
+                by_template = self._by_template.get(template_key(template), {})
+                by_party = self._by_party.get(party, {})
+                smaller, larger = sorted([by_template, by_party], key=len)
+
+                matches = [c for cid, c in smaller.items() if cid in larger]
+            elif template is not None:
+                matches = list(
+                    self._by_template.get(template_key(template), {}).values()
+                )
+            elif party is not None:
+                matches = list(self._by_party.get(party, {}).values())
+            else:
+                matches = list(self._by_cid.values())
+
+        if where:
+            matches = [
+                c
+                for c in matches
+                if all(c["create_arguments"].get(k) == v for k, v in where.items())
+            ]
+
+        return matches
@@ -0,0 +1,237 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+import asyncio
+import grpc
+import uuid
+
+import com.daml.ledger.api.v2.admin.party_management_service_pb2 as party_management_service_pb2
+import com.daml.ledger.api.v2.admin.party_management_service_pb2_grpc as party_management_service_pb2_grpc
+import com.daml.ledger.api.v2.command_service_pb2 as command_service_pb2
+import com.daml.ledger.api.v2.command_service_pb2_grpc as command_service_pb2_grpc
+import com.daml.ledger.api.v2.package_service_pb2 as package_service_pb2
+import com.daml.ledger.api.v2.package_service_pb2_grpc as package_service_pb2_grpc
+import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
+import com.daml.ledger.api.v2.state_service_pb2_grpc as state_service_pb2_grpc
+import com.daml.ledger.api.v2.version_service_pb2 as version_service_pb2
+import com.daml.ledger.api.v2.version_service_pb2_grpc as version_service_pb2_grpc
+import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+import com.daml.ledger.api.v2.update_service_pb2_grpc as update_service_pb2_grpc
+
+from .config import ChannelConfig
+from .ledger import (
+    build_commands,
+    call_compression,
+    find_party,
+    make_stub,
+    open_channels,
+    party_list,
+    transaction_filter,
+)
+from .value import decode
+
+# Upper bound on the number of SubmitAndWait calls outstanding at any one
+# time. Further calls to submit() wait for a slot rather than piling up on
+# the participant.
+DEFAULT_MAX_IN_FLIGHT = 64
+
+
+class AsyncLedgerConnection:
+    def __init__(
+        self,
+        addr,
+        *,
+        user_id="default",
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        channel_config=None,
+    ):
+        self.addr = addr
+        self.user_id = user_id
+        self.max_in_flight = max_in_flight
+        self.channel_config = channel_config or ChannelConfig()
+        self.channel = None
+        self.channels = []
+
+    async def __aenter__(self):
+        await self.open()
+
+        return self
+
+    async def __aexit__(self, exception_type, exception_value, exception_traceback):
+        await self.close()
+
+    async def open(self):
+        if self.channel is not None:
+            raise Exception(f"Cannot open a channel twice: {self}")
+
+        channels = open_channels(
+            grpc.aio.insecure_channel, self.addr, self.channel_config
+        )
+
+        self.channel = channels[0]
+        self.channels = channels
+
+        self._version_service = make_stub(
+            version_service_pb2_grpc.VersionServiceStub, channels
+        )
+        self._package_service = make_stub(
+            package_service_pb2_grpc.PackageServiceStub, channels
+        )
+        self._party_management_service = make_stub(
+            party_management_service_pb2_grpc.PartyManagementServiceStub, channels
+        )
+        self._state_service = make_stub(
+            state_service_pb2_grpc.StateServiceStub, channels
+        )
+        self._command_service = make_stub(
+            command_service_pb2_grpc.CommandServiceStub, channels
+        )
+        self._update_service = make_stub(
+            update_service_pb2_grpc.UpdateServiceStub, channels
+        )
+
+        self._submit_slots = asyncio.Semaphore(self.max_in_flight)
+
+        return self
+
+    async def close(self):
+        if self.channel is None:
+            raise Exception(f"Channel cannot be closed (not open): {self}")
+
+        for channel in self.channels:
+            await channel.close()
+
+        self.channel = None
+        self.channels = []
+
+    def _gen_command_id(self):
+        return uuid.uuid4().hex
+
+    def _compression(self, call_type):
+        return call_compression(self.channel_config, call_type)
+
+    async def get_ledger_version(self):
+        req = version_service_pb2.GetLedgerApiVersionRequest()
+
+        return (
+            await self._version_service.GetLedgerApiVersion(
+                req, compression=self._compression("query")
+            )
+        ).version
+
+    async def get_ledger_end(self):
+        req = state_service_pb2.GetLedgerEndRequest()
+
+        return (
+            await self._state_service.GetLedgerEnd(
+                req, compression=self._compression("query")
+            )
+        ).offset
+
+    async def get_ledger_packages(self):
+        req = package_service_pb2.ListPackagesRequest()
+
+        return await self._package_service.ListPackages(
+            req, compression=self._compression("query")
+        )
+
+    async def get_ledger_parties(self):
+        req = party_management_service_pb2.ListKnownPartiesRequest()
+
+        return party_list(
+            await self._party_management_service.ListKnownParties(
+                req, compression=self._compression("query")
+            )
+        )
+
+    async def get_ledger_local_parties(self):
+        return [p for p in await self.get_ledger_parties() if p["is_local"]]
+
+    async def lookup_local_party_id(self, party_name):
+        return find_party(await self.get_ledger_local_parties(), party_name)
+
+    async def allocate_party(self, party_id_hint):
+        req = party_management_service_pb2.AllocatePartyRequest(
+            party_id_hint=party_id_hint
+        )
+
+        return await self._party_management_service.AllocateParty(
+            req, compression=self._compression("query")
+        )
+
+    async def get_active_contracts(
+        self, party, template_ids=[], *, active_at_offset=None
+    ):
+        if active_at_offset is None:
+            active_at_offset = await self.get_ledger_end()
+
+        req = state_service_pb2.GetActiveContractsRequest(
+            filter=transaction_filter(party, template_ids),
+            verbose=True,
+            active_at_offset=active_at_offset,
+        )
+
+        return [
+            decode(c.active_contract)
+            async for c in self._state_service.GetActiveContracts(
+                req, compression=self._compression("stream")
+            )
+            if c.HasField("active_contract")
+        ]
+
+    async def submit(
+        self,
+        act_as,
+        commands,
+        *,
+        command_id=None,
+        deduplication_offset=None,
+        disclosed_contracts=[],
+    ):
+        commands = build_commands(
+            self.user_id,
+            command_id or self._gen_command_id(),
+            act_as,
+            commands,
+            deduplication_offset=deduplication_offset,
+            disclosed_contracts=disclosed_contracts,
+        )
+
+        req = command_service_pb2.SubmitAndWaitRequest(commands=commands)
+
+        async with self._submit_slots:
+            resp = await self._command_service.SubmitAndWaitForTransaction(
+                req, compression=self._compression("submit")
+            )
+
+        return decode(resp)
+
+    async def _get_updates(
+        self, begin_exclusive, end_inclusive, party, template_ids=[]
+    ):
+        req = update_service_pb2.GetUpdatesRequest(
+            begin_exclusive=begin_exclusive,
+            end_inclusive=end_inclusive,
+            filter=transaction_filter(party, template_ids),
+            verbose=True,
+        )
+
+        async for u in self._update_service.GetUpdates(
+            req, compression=self._compression("stream")
+        ):
+            yield decode(u)
+
+    async def get_updates(self, party, template_ids=[]):
+        offset_end = await self.get_ledger_end()
+
+        async for u in self._get_updates(0, offset_end, party, template_ids):
+            yield u
+
+    async def get_update_stream(self, party, template_ids=[]):
+        offset_end = await self.get_ledger_end()
+
+        async for u in self._get_updates(offset_end, None, party, template_ids):
+            yield u
@@ -0,0 +1,219 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+import grpc
+import threading
+import time
+
+import com.daml.ledger.api.v2.transaction_filter_pb2 as transaction_filter_pb2
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .ledger import _ensure_list
+from .util import FAIL
+
+DEFAULT_MAX_COMMANDS = 100
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_LINGER_SEC = 0.01
+DEFAULT_MAX_IN_FLIGHT = 4
+
+LEDGER_EFFECTS = transaction_filter_pb2.TRANSACTION_SHAPE_LEDGER_EFFECTS
+
+# Errors with which the ledger rejects a transaction, so that none of its
+# commands took effect. Any other failure (a timeout, a lost connection)
+# may come after the batch committed.
+REJECTION_STATUS_CODES = [
+    grpc.StatusCode.INVALID_ARGUMENT,
+    grpc.StatusCode.NOT_FOUND,
+    grpc.StatusCode.FAILED_PRECONDITION,
+    grpc.StatusCode.ALREADY_EXISTS,
+]
+
+
+def rejected(e):
+    if not isinstance(e, grpc.RpcError) or e.code() not in REJECTION_STATUS_CODES:
+        return False
+
+    # A duplicate command id means the batch itself went through.
+    return not (e.details() or "").startswith("DUPLICATE_COMMAND")
+
+
+# Splits a ledger-effects transaction into the root event of each command,
+# in command order. Each command yields exactly one root node, and an
+# exercise's descendants are numbered up to its last_descendant_node_id.
+def command_results(tx):
+    roots = []
+    last_node_id = -1
+
+    for evt in sorted(tx["events"], key=lambda e: e["node_id"]):
+        if evt["node_id"] > last_node_id:
+            roots.append(evt)
+            last_node_id = evt.get("last_descendant_node_id", evt["node_id"])
+
+    return roots
+
+
+class _Batch:
+    def __init__(self, act_as):
+        self.act_as = act_as
+        self.commands = []
+        self.futures = []
+        self.size = 0
+        self.started_at = time.monotonic()
+
+    def add(self, command, size):
+        future = Future()
+
+        self.commands.append(command)
+        self.futures.append(future)
+        self.size += size
+
+        return future
+
+
+# Packs commands submitted with the same act_as into multi-command
+# transactions. A batch is sent once it reaches max_commands or max_bytes
+# of encoded commands, or linger_sec after its first command arrived.
+#
+# submit() returns a Future resolving to the command's root event: the
+# created event of a create, the exercised event of an exercise. A
+# transaction is atomic, so a rejected batch is resubmitted one command per
+# transaction to give every command its own outcome. A batch that fails
+# any other way may have committed, so its commands fail with the error
+# rather than risk being applied twice.
+#
+# transactions counts every submission, including the single-command
+# transactions of fallbacks.
+class BatchingSubmitter:
+    def __init__(
+        self,
+        ledger,
+        *,
+        max_commands=DEFAULT_MAX_COMMANDS,
+        max_bytes=DEFAULT_MAX_BYTES,
+        linger_sec=DEFAULT_LINGER_SEC,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    ):
+        self.ledger = ledger
+        self.max_commands = max_commands
+        self.max_bytes = max_bytes
+        self.linger_sec = linger_sec
+
+        self.batches_sent = 0
+        self.transactions = 0
+        self.fallbacks = 0
+
+        self._cv = threading.Condition()
+        self._pending = {}
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_in_flight)
+        self._thread = threading.Thread(target=self._linger, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, act_as, command):
+        act_as = tuple(_ensure_list(act_as))
+        size = command.ByteSize()
+
+        with self._cv:
+            if self._closed:
+                FAIL("Submit to closed BatchingSubmitter")
+
+            batch = self._pending.get(act_as)
+
+            if batch is not None and batch.size + size > self.max_bytes:
+                self._send(self._pending.pop(act_as))
+                batch = None
+
+            if batch is None:
+                batch = self._pending[act_as] = _Batch(act_as)
+                self._cv.notify()
+
+            future = batch.add(command, size)
+
+            if len(batch.commands) >= self.max_commands or batch.size >= self.max_bytes:
+                self._send(self._pending.pop(act_as))
+
+        return future
+
+    def flush(self):
+        with self._cv:
+            for act_as in list(self._pending):
+                self._send(self._pending.pop(act_as))
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+
+        self._thread.join()
+        self.flush()
+        self._executor.shutdown()
+
+    def _send(self, batch):
+        self.batches_sent += 1
+        self._executor.submit(self._run, batch)
+
+    def _linger(self):
+        with self._cv:
+            while not self._closed:
+                now = time.monotonic()
+                timeout = None
+
+                for act_as, batch in list(self._pending.items()):
+                    due = batch.started_at + self.linger_sec
+
+                    if due <= now:
+                        self._send(self._pending.pop(act_as))
+                    elif timeout is None or due - now < timeout:
+                        timeout = due - now
+
+                self._cv.wait(timeout)
+
+    def _submit(self, batch):
+        with self._cv:
+            self.transactions += 1
+
+        return self.ledger.submit(
+            list(batch.act_as), batch.commands, transaction_shape=LEDGER_EFFECTS
+        )
+
+    def _run(self, batch):
+        try:
+            tx = self._submit(batch)
+        except Exception as e:
+            if len(batch.commands) > 1 and rejected(e):
+                with self._cv:
+                    self.fallbacks += 1
+
+                for command, future in zip(batch.commands, batch.futures):
+                    single = _Batch(batch.act_as)
+                    single.commands.append(command)
+                    single.futures.append(future)
+                    self._run(single)
+            else:
+                for future in batch.futures:
+                    future.set_exception(e)
+            return
+
+        results = command_results(tx)
+
+        if len(results) != len(batch.commands):
+            e = RuntimeError(
+                f"Expected {len(batch.commands)} root events, "
+                f"found {len(results)} in {tx['update_id']}"
+            )
+            for future in batch.futures:
+                future.set_exception(e)
+            return
+
+        for future, result in zip(batch.futures, results):
+            future.set_result(result)
@@ -0,0 +1,152 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+import grpc
+import os
+import tempfile
+import time
+
+from pathlib import Path
+
+from .retry import RetryPolicy
+from .util import FAIL
+
+
+# Persists the offset of the last processed update. Writes are batched,
+# either every flush_every updates or every flush_interval_sec, and each
+# write replaces the file atomically so a crash never leaves a torn
+# checkpoint behind.
+class CheckpointFile:
+    def __init__(self, path, *, flush_every=100, flush_interval_sec=1.0):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.flush_interval_sec = flush_interval_sec
+
+        self.offset = None
+        self._saved_offset = None
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def load(self):
+        if self.path.is_file():
+            text = self.path.read_text().strip()
+
+            try:
+                self.offset = int(text)
+            except ValueError:
+                FAIL(f"Invalid checkpoint in {self.path}: {text!r}")
+
+            self._saved_offset = self.offset
+
+        return self.offset
+
+    def update(self, offset):
+        self.offset = offset
+        self._pending += 1
+
+        if (
+            self._pending >= self.flush_every
+            or time.monotonic() - self._flushed_at >= self.flush_interval_sec
+        ):
+            self.flush()
+
+    def flush(self):
+        if self.offset is None or self.offset == self._saved_offset:
+            return
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{self.offset}\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._saved_offset = self.offset
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+
+# Tails GetUpdates from a checkpointed offset, reconnecting with the
+# retry policy's backoff from the last delivered offset when the stream
+# fails with an error the policy retries for "stream" calls. Reconnects
+# are not limited by the policy's max_attempts. Updates at or below the last delivered
+# offset are dropped, so a reconnect neither skips nor repeats updates.
+#
+# An update's offset is checkpointed once the consumer asks for the next
+# one, i.e. after it has been processed.
+class ResumableUpdateStream:
+    def __init__(
+        self,
+        ledger,
+        party,
+        template_ids=[],
+        *,
+        checkpoint=None,
+        begin_exclusive=None,
+        retry_policy=None,
+    ):
+        self.ledger = ledger
+        self.party = party
+        self.template_ids = template_ids
+        self.checkpoint = checkpoint
+        self.begin_exclusive = begin_exclusive
+        self.retry_policy = retry_policy or RetryPolicy(
+            initial_backoff_sec=0.5, max_backoff_sec=30.0
+        )
+
+        self.offset = None
+        self.reconnects = 0
+
+    def _initial_offset(self):
+        if self.checkpoint is not None:
+            offset = self.checkpoint.load()
+
+            if offset is not None:
+                return offset
+
+        if self.begin_exclusive is not None:
+            return self.begin_exclusive
+
+        return self.ledger.get_ledger_end()
+
+    def __iter__(self):
+        self.offset = self._initial_offset()
+        failures = 0
+
+        try:
+            while True:
+                try:
+                    for u in self.ledger._get_updates(
+                        self.offset, None, self.party, self.template_ids
+                    ):
+                        if u["offset"] <= self.offset:
+                            continue
+
+                        yield u
+
+                        self.offset = u["offset"]
+                        if self.checkpoint is not None:
+                            self.checkpoint.update(self.offset)
+
+                        failures = 0
+
+                except grpc.RpcError as e:
+                    if not self.retry_policy.is_retryable("stream", e):
+                        raise
+
+                failures += 1
+                time.sleep(self.retry_policy.backoff(failures))
+                self.reconnects += 1
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.flush()
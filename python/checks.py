@@ -0,0 +1,185 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Behavioural checks for the client, run against an in-process fake
+# ledger. Run with:
+#
+#   PYTHONPATH=target/_gen .venv/bin/python3 -m python.checks [check ...]
+#
+# to run the named checks (default: all of them), exiting non-zero if
+# any fails. This is what `make check` runs.
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import threading
+
+from .aio_ledger import AsyncLedgerConnection
+from .commands import ASSET_ID
+from .compact import CompactDecoder
+from .fake_ledger import FakeLedgerState, commands_for, start_fake_ledger
+from .ledger import create_contract, exercise_contract_choice
+from .output import NdjsonWriter
+from .value import decode, party
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def _ndjson(objs):
+    out = io.StringIO()
+
+    with NdjsonWriter(out, flush_interval_sec=None) as writer:
+        writer.write_all(objs)
+
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def _give_all(state, new_owner):
+    for _, transaction in list(state.updates):
+        for e in transaction.events:
+            state.submit(
+                commands_for(
+                    f"give-{e.created.contract_id}",
+                    list(e.created.signatories),
+                    [
+                        exercise_contract_choice(
+                            e.created.template_id,
+                            e.created.contract_id,
+                            "Give",
+                            {"newOwner": new_owner},
+                        )
+                    ],
+                )
+            )
+
+
+# Compact events written as NDJSON carry the same fields, including their
+# kind, as the dicts decode() produces for the same events.
+def check_compact_ndjson():
+    state = FakeLedgerState()
+    state.generate_history(["alice", "bob"], 10)
+    _give_all(state, state.allocate_party("carol"))
+
+    transactions = [t for _, t in state.updates]
+    transactions += state.ledger_effects.values()
+
+    events = [e for t in transactions for e in t.events]
+    compact = CompactDecoder()
+
+    for expected, line in zip(
+        _ndjson(decode(e) for e in events),
+        _ndjson(compact.decode(e) for e in events),
+    ):
+        expect(
+            {k: line.get(k) for k in expected} == expected,
+            f"compact {expected['event']} event written as {line}",
+        )
+
+    kinds = {e.WhichOneof("event") for e in events}
+    expect(kinds == {"created", "archived", "exercised"}, f"only saw {kinds}")
+
+
+# Counts the requests the fake ledger is serving at once.
+class _ConcurrencyProbe(FakeLedgerState):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+        self._probe_lock = threading.Lock()
+
+    def delay(self):
+        with self._probe_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+        try:
+            super().delay()
+        finally:
+            with self._probe_lock:
+                self.active -= 1
+
+
+# AsyncLedgerConnection never has more than max_in_flight submissions
+# outstanding, however many are started at once.
+def check_aio_max_in_flight(max_in_flight=4, submissions=32):
+    state = _ConcurrencyProbe(latency_sec=0.05)
+    state.allocate_party("alice")
+    server, _, addr = start_fake_ledger(state=state, max_workers=submissions)
+
+    async def submit_all():
+        async with AsyncLedgerConnection(addr, max_in_flight=max_in_flight) as ledger:
+            alice = await ledger.lookup_local_party_id("alice")
+            state.max_active = 0
+
+            return await asyncio.gather(
+                *(
+                    ledger.submit(
+                        alice,
+                        create_contract(
+                            ASSET_ID,
+                            {
+                                "issuer": party(alice),
+                                "owner": party(alice),
+                                "name": f"a{n}",
+                            },
+                        ),
+                    )
+                    for n in range(submissions)
+                )
+            )
+
+    try:
+        transactions = asyncio.run(submit_all())
+    finally:
+        server.stop(0)
+
+    expect(len(transactions) == submissions, f"{len(transactions)} submitted")
+    expect(
+        state.max_active == max_in_flight,
+        f"{state.max_active} submissions in flight, expected {max_in_flight}",
+    )
+
+
+CHECKS = {
+    "compact_ndjson": check_compact_ndjson,
+    "aio_max_in_flight": check_aio_max_in_flight,
+}
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog="checks")
+    parser.add_argument("checks", nargs="*")
+    opts = parser.parse_args(argv)
+
+    for name in opts.checks:
+        if name not in CHECKS:
+            parser.error(f"unknown check: {name} (expected one of {list(CHECKS)})")
+
+    failed = []
+
+    for name in opts.checks or list(CHECKS):
+        try:
+            CHECKS[name]()
+            print(f"{name:28} ok")
+        except CheckFailed as e:
+            print(f"{name:28} FAILED: {e}")
+            failed.append(name)
+
+    if failed:
+        sys.exit(f"{len(failed)} check(s) failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
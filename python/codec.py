@@ -0,0 +1,228 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Specialized codecs for known templates and choice argument records.
+#
+# The build does not compile the Daml-LF archive protos, so the field
+# layout is declared alongside the template (mirroring the Daml source)
+# rather than read from PackageService.GetPackage. From that declaration
+# each record gets a __slots__ class plus an encoder and a decoder that
+# are generated as straight-line code, with no per-field type dispatch.
+
+import keyword
+
+import com.daml.ledger.api.v2.value_pb2 as value_pb2
+
+from .util import FAIL
+from .value import (
+    TEMPLATE_DECODERS,
+    Package,
+    decode_numeric,
+    decode_party,
+    decode_record,
+    decode_timestamp,
+    decode_value,
+    numeric,
+    value,
+)
+
+# Per field type, the expression encoding Python value {0} as a Value and
+# the expression decoding Value {0}.
+FIELD_TYPES = {
+    "party": ("Value(party={0}.party)", "decode_party({0}.party)"),
+    "text": ("Value(text={0})", "{0}.text"),
+    "int64": ("Value(int64={0})", "{0}.int64"),
+    "bool": ("Value(bool={0})", "{0}.bool"),
+    "contract_id": ("Value(contract_id={0})", "{0}.contract_id"),
+    "numeric": ("numeric({0})", "decode_numeric({0}.numeric)"),
+    "timestamp": ("value({0})", "decode_timestamp({0}.timestamp)"),
+    "value": ("value({0})", "decode_value({0})"),
+}
+
+_NAMESPACE = {
+    "Record": value_pb2.Record,
+    "RecordField": value_pb2.RecordField,
+    "Value": value_pb2.Value,
+    "decode_numeric": decode_numeric,
+    "decode_party": decode_party,
+    "decode_timestamp": decode_timestamp,
+    "decode_value": decode_value,
+    "numeric": numeric,
+    "value": value,
+}
+
+
+# Registered template codecs by TEMPLATE_DECODERS key.
+TEMPLATE_CODECS = {}
+
+
+def _compile(name, source, **names):
+    namespace = {**_NAMESPACE, **names}
+    exec(source, namespace)
+
+    return namespace[name]
+
+
+class CodecRecord:
+    __slots__ = ()
+
+    _codec = None
+
+    def encode(self):
+        return self._codec.encode(self)
+
+    def as_dict(self):
+        return {label: getattr(self, label) for label in self.__slots__}
+
+    def get(self, label, default=None):
+        if label in self.__slots__:
+            return getattr(self, label)
+        else:
+            return default
+
+    def __getitem__(self, label):
+        if label in self.__slots__:
+            return getattr(self, label)
+        else:
+            raise KeyError(label)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, label) == getattr(other, label) for label in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{label}={getattr(self, label)!r}" for label in self.__slots__
+        )
+
+        return f"{type(self).__name__}({fields})"
+
+    # Records cross process boundaries (e.g. from snapshot decode workers)
+    # by registry key, since their classes are generated at runtime.
+    def __reduce__(self):
+        if self._codec.key is None:
+            FAIL(f"Cannot pickle record of unregistered codec: {self._codec.name}")
+
+        return (_restore_record, (self._codec.key, tuple(self.as_dict().values())))
+
+
+def _restore_record(key, values):
+    return TEMPLATE_CODECS[key].record_class(*values)
+
+
+class RecordCodec:
+    def __init__(self, name, fields):
+        for label, field_type in fields.items():
+            if not label.isidentifier() or keyword.iskeyword(label):
+                FAIL(f"Unsupported field name in {name}: {label}")
+            elif field_type not in FIELD_TYPES:
+                FAIL(f"Unsupported field type in {name}.{label}: {field_type}")
+
+        self.name = name
+        self.fields = dict(fields)
+        self.key = None
+
+        labels = list(self.fields.keys())
+        args = ", ".join(labels)
+
+        init = _compile(
+            "__init__",
+            f"def __init__(self, {args}):\n"
+            + "".join(f"    self.{label} = {label}\n" for label in labels)
+            + ("" if labels else "    pass\n"),
+        )
+
+        self.record_class = type(
+            name,
+            (CodecRecord,),
+            {"__slots__": tuple(labels), "__init__": init, "_codec": self},
+        )
+
+        encoded_fields = ", ".join(
+            f"RecordField(label={label!r}, "
+            f"value={FIELD_TYPES[t][0].format('r.' + label)})"
+            for label, t in self.fields.items()
+        )
+
+        self.encode = _compile(
+            "encode",
+            f"def encode(r):\n    return Record(fields=[{encoded_fields}])\n",
+        )
+
+        decoded_fields = ", ".join(
+            FIELD_TYPES[t][1].format(f"f[{index}].value")
+            for index, t in enumerate(self.fields.values())
+        )
+
+        # Fields arrive in declaration order; anything else (e.g. an
+        # upgraded package with extra fields) is decoded by label.
+        self.decode = _compile(
+            "decode",
+            f"def decode(r):\n"
+            f"    f = r.fields\n"
+            f"    if len(f) != {len(labels)}:\n"
+            f"        return decode_by_label(r)\n"
+            f"    return cls({decoded_fields})\n",
+            cls=self.record_class,
+            decode_by_label=self._decode_by_label,
+        )
+
+    def _decode_by_label(self, r):
+        fields = decode_record(r)
+
+        return self.record_class(*[fields.get(label) for label in self.fields])
+
+    def __call__(self, *args, **kwargs):
+        return self.record_class(*args, **kwargs)
+
+
+class TemplateCodec(RecordCodec):
+    def __init__(self, package, module_name, entity_name, fields, *, choices={}):
+        super().__init__(entity_name, fields)
+
+        self.spec = (
+            package.package_id,
+            module_name,
+            entity_name,
+            dict(fields),
+            dict(choices),
+        )
+        self.package = package
+        self.id = package.id(module_name, entity_name)
+        self.choices = {
+            choice: RecordCodec(choice, choice_fields)
+            for choice, choice_fields in {"Archive": {}, **choices}.items()
+        }
+
+    # Makes decode_created_event use this codec for the template's create
+    # arguments. Events name the package by id and by package name, so the
+    # codec is registered under whichever the template id uses.
+    def register(self):
+        package_id = self.id.package_id
+
+        if package_id.startswith("#"):
+            key = ("name", package_id[1:])
+        else:
+            key = ("id", package_id)
+
+        self.key = (*key, self.id.module_name, self.id.entity_name)
+        TEMPLATE_DECODERS[self.key] = self.decode
+        TEMPLATE_CODECS[self.key] = self
+
+        return self
+
+
+def registered_codecs():
+    return [codec.spec for codec in TEMPLATE_CODECS.values()]
+
+
+# Process pool initializer that re-registers codecs in a worker.
+def register_codecs(specs):
+    for package_id, module_name, entity_name, fields, choices in specs:
+        TemplateCodec(
+            Package(package_id), module_name, entity_name, fields, choices=choices
+        ).register()
@@ -0,0 +1,620 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Micro-benchmarks for value encoding and decoding. Run with:
+#
+#   PYTHONPATH=target/_gen .venv/bin/python3 -m python.codec_bench [case ...]
+#
+# to print ns/op and the peak bytes allocated by one op, or with --memory
+# to measure bytes retained per decoded event.
+#
+# --record writes the results to codec_bench_baseline.json, and --check
+# compares against it, exiting non-zero if any case is slower or
+# allocates more than --threshold (default 25%) above its baseline. This
+# is what `make bench-codec` runs. Timings only compare meaningfully on
+# the machine and Python release the baseline was recorded with, so
+# --check refuses a baseline from another Python release; re-record
+# (`make bench-codec-baseline`) when moving the gate to new hardware.
+
+import argparse
+import contextlib
+import datetime
+import decimal
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from pathlib import Path
+
+import com.daml.ledger.api.v2.event_pb2 as event_pb2
+import com.daml.ledger.api.v2.transaction_pb2 as transaction_pb2
+import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+import com.daml.ledger.api.v2.value_pb2 as value_pb2
+
+from .commands import ASSET, ASSET_ID
+from .compact import CompactDecoder
+from .decoder import Decoder
+from .ledger import (
+    create_contract,
+    create_prototype,
+    exercise_contract_choice,
+    exercise_prototype,
+)
+from .pipeline import decode_pool, pipelined_decode
+from .value import (
+    decode,
+    decode_lazy,
+    decode_record,
+    decode_value,
+    decode_value_any_depth,
+    decode_value_iterative,
+    numeric,
+    party,
+    record,
+    value,
+)
+
+# Event decoding is measured with the Asset codec registered, as with
+# config codecDecode.
+ASSET.register()
+
+ISSUER = "issuer::1220" + "0" * 64
+OWNER = "owner::1220" + "1" * 64
+ASSET_CID = "00" + "ab" * 32 + "ca10"
+
+DEFAULT_BASELINE = Path(__file__).with_name("codec_bench_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+# Cases timed by --check. updates_decode_pipeline scales with the core
+# count, so it is only run on request.
+UNGATED_CASES = {"updates_decode_pipeline"}
+
+
+def asset_created_event(blob_bytes=0):
+    return event_pb2.CreatedEvent(
+        offset=42,
+        node_id=0,
+        contract_id=ASSET_CID,
+        template_id=ASSET_ID,
+        create_arguments=ASSET(party(ISSUER), party(OWNER), "widget").encode(),
+        witness_parties=[ISSUER, OWNER],
+        signatories=[ISSUER],
+        observers=[OWNER],
+        package_name="asset-model",
+        created_event_blob=b"\0" * blob_bytes,
+    )
+
+
+def nested_value(width=10):
+    entries = [
+        value_pb2.GenMap.Entry(
+            key=value(f"key-{n}"),
+            value=value(
+                [
+                    record(
+                        {
+                            "count": n,
+                            "amount": numeric(decimal.Decimal("1.25")),
+                            "flag": n % 2 == 0,
+                            "owner": party(OWNER),
+                        }
+                    )
+                    for _ in range(width)
+                ]
+            ),
+        )
+        for n in range(width)
+    ]
+
+    return value_pb2.Value(
+        list=value_pb2.List(
+            elements=[value_pb2.Value(gen_map=value_pb2.GenMap(entries=entries))] * 2
+        )
+    )
+
+
+def scalar_list(kind, values):
+    return value_pb2.Value(
+        list=value_pb2.List(elements=[value_pb2.Value(**{kind: v}) for v in values])
+    )
+
+
+def amounts(count=1000):
+    return scalar_list("numeric", [f"{n}.{n % 100:02}00000000" for n in range(count)])
+
+
+def timestamps(count=1000):
+    return scalar_list("timestamp", [1760000000000000 + n for n in range(count)])
+
+
+def decimals(count=1000):
+    return [decimal.Decimal(f"{n}.{n % 100:02}") for n in range(count)]
+
+
+def datetimes(count=1000):
+    return [
+        datetime.datetime.fromtimestamp(1760000000 + n, datetime.timezone.utc)
+        for n in range(count)
+    ]
+
+
+def large_genmap(count=10000):
+    return {f"key-{n}": n for n in range(count)}
+
+
+def long_list(count=1000000):
+    return value(list(range(count)))
+
+
+# Built in place: nesting this deep cannot go through the constructors,
+# which copy by serializing and parsing, and protobuf limits parse depth.
+def deep_list(depth=10000):
+    v = value_pb2.Value()
+    inner = v
+
+    for _ in range(depth):
+        inner = inner.list.elements.add()
+
+    inner.int64 = 1
+
+    return v
+
+
+def updates_responses(count=100, events=10, blob_bytes=1024):
+    created = asset_created_event(blob_bytes)
+
+    return [
+        update_service_pb2.GetUpdatesResponse(
+            transaction=transaction_pb2.Transaction(
+                update_id=f"update-{n}",
+                offset=n,
+                events=[event_pb2.Event(created=created)] * events,
+            )
+        )
+        for n in range(count)
+    ]
+
+
+# Counts Asset creates, the kind of filter that reads two fields per event.
+def count_assets(decode, responses):
+    n = 0
+
+    for u in responses:
+        for evt in decode(u)["events"]:
+            if (
+                evt["event"] == "created"
+                and evt["template_id"]["entity_name"] == "Asset"
+            ):
+                n += 1
+
+    return n
+
+
+def asset_fields():
+    return {"issuer": party(ISSUER), "owner": party(OWNER), "name": "widget"}
+
+
+def case_asset_created_event():
+    v = asset_created_event()
+    return lambda: decode(v)
+
+
+def case_asset_decode_generic():
+    r = asset_created_event().create_arguments
+    return lambda: decode_record(r)
+
+
+def case_asset_decode_codec():
+    r = asset_created_event().create_arguments
+    return lambda: ASSET.decode(r)
+
+
+def case_asset_encode_generic():
+    fields = asset_fields()
+    return lambda: record(fields)
+
+
+def case_asset_encode_codec():
+    asset = ASSET(**asset_fields())
+    return lambda: asset.encode()
+
+
+def case_command_create_generic():
+    fields = asset_fields()
+    return lambda: create_contract(ASSET_ID, fields)
+
+
+def case_command_create_codec():
+    fields = asset_fields()
+    return lambda: create_contract(ASSET_ID, ASSET(**fields))
+
+
+def case_command_create_prototype():
+    issue = create_prototype(ASSET_ID, ASSET(**asset_fields()))
+    return lambda: issue(name="widget")
+
+
+def case_command_exercise_generic():
+    give = ASSET.choices["Give"](newOwner=party(OWNER))
+    return lambda: exercise_contract_choice(ASSET_ID, ASSET_CID, "Give", give)
+
+
+def case_command_exercise_prototype():
+    give = exercise_prototype(
+        ASSET_ID, "Give", ASSET.choices["Give"](newOwner=party(OWNER))
+    )
+    return lambda: give(ASSET_CID)
+
+
+def case_genmap_encode():
+    v = large_genmap()
+    return lambda: value(v)
+
+
+def case_genmap_decode():
+    v = value(large_genmap())
+    return lambda: decode(v)
+
+
+def case_tuple_encode():
+    v = (1, "widget", party(OWNER))
+    return lambda: value(v)
+
+
+def case_tuple_decode():
+    v = value((1, "widget", party(OWNER)))
+    return lambda: decode(v)
+
+
+def case_amounts_encode():
+    v = decimals()
+    return lambda: [numeric(n) for n in v]
+
+
+def case_timestamps_encode():
+    v = datetimes()
+    return lambda: value(v)
+
+
+def case_updates_count_eager():
+    responses = updates_responses()
+    return lambda: count_assets(decode, responses)
+
+
+def case_updates_count_lazy():
+    responses = updates_responses()
+    return lambda: count_assets(decode_lazy, responses)
+
+
+def case_updates_count_compact():
+    responses = updates_responses()
+    return lambda: count_assets(CompactDecoder().decode, responses)
+
+
+def case_long_list_recursive():
+    v = long_list()
+    return lambda: decode_value(v)
+
+
+def case_long_list_iterative():
+    v = long_list()
+    return lambda: decode_value_iterative(v)
+
+
+def case_nested_list_genmap_iterative():
+    v = nested_value()
+    return lambda: decode_value_iterative(v)
+
+
+def case_deep_300_recursive():
+    v = deep_list(300)
+    return lambda: decode_value(v)
+
+
+def case_deep_300_iterative():
+    v = deep_list(300)
+    return lambda: decode_value_iterative(v)
+
+
+def case_deep_10k_iterative():
+    v = deep_list()
+    return lambda: decode_value_iterative(v)
+
+
+# Recursion to the limit, then the iterative fallback.
+def case_deep_10k_any_depth():
+    v = deep_list()
+    return lambda: decode_value_any_depth(v)
+
+
+def case_amounts_decimal():
+    v = amounts()
+    return lambda: decode(v)
+
+
+def case_amounts_fixed():
+    v = amounts()
+    return lambda: Decoder(numeric="fixed").decode(v)
+
+
+def case_amounts_fixed_array():
+    v = amounts()
+    return lambda: Decoder(numeric="fixed", arrays=True).decode(v)
+
+
+def case_timestamps_datetime():
+    v = timestamps()
+    return lambda: decode(v)
+
+
+def case_timestamps_micros():
+    v = timestamps()
+    return lambda: Decoder(timestamp="micros").decode(v)
+
+
+def case_timestamps_micros_array():
+    v = timestamps()
+    return lambda: Decoder(timestamp="micros", arrays=True).decode(v)
+
+
+def case_updates_decode_serial():
+    responses = updates_responses(1000)
+    return lambda: [decode(u) for u in responses]
+
+
+# One worker per core; compare with updates_decode_serial on a multi-core
+# machine.
+@contextlib.contextmanager
+def case_updates_decode_pipeline():
+    serialized = [u.SerializeToString() for u in updates_responses(1000)]
+
+    with decode_pool() as pool:
+        yield lambda: list(
+            pipelined_decode(
+                pool,
+                update_service_pb2.GetUpdatesResponse,
+                serialized,
+                window=2 * (os.cpu_count() or 1),
+            )
+        )
+
+
+def case_nested_list_genmap():
+    v = nested_value()
+    return lambda: decode(v)
+
+
+# Each case sets up its input and returns the operation to time. Cases
+# that hold resources (worker pools) are context managers that yield the
+# operation and release them on exit.
+CASES = {
+    "asset_created_event": case_asset_created_event,
+    "asset_decode_generic": case_asset_decode_generic,
+    "asset_decode_codec": case_asset_decode_codec,
+    "asset_encode_generic": case_asset_encode_generic,
+    "asset_encode_codec": case_asset_encode_codec,
+    "command_create_generic": case_command_create_generic,
+    "command_create_codec": case_command_create_codec,
+    "command_create_prototype": case_command_create_prototype,
+    "command_exercise_generic": case_command_exercise_generic,
+    "command_exercise_prototype": case_command_exercise_prototype,
+    "genmap_encode": case_genmap_encode,
+    "genmap_decode": case_genmap_decode,
+    "tuple_encode": case_tuple_encode,
+    "tuple_decode": case_tuple_decode,
+    "nested_list_genmap": case_nested_list_genmap,
+    "nested_list_genmap_iterative": case_nested_list_genmap_iterative,
+    "long_list_recursive": case_long_list_recursive,
+    "long_list_iterative": case_long_list_iterative,
+    "deep_300_recursive": case_deep_300_recursive,
+    "deep_300_iterative": case_deep_300_iterative,
+    "deep_10k_iterative": case_deep_10k_iterative,
+    "deep_10k_any_depth": case_deep_10k_any_depth,
+    "amounts_encode": case_amounts_encode,
+    "amounts_decimal": case_amounts_decimal,
+    "amounts_fixed": case_amounts_fixed,
+    "amounts_fixed_array": case_amounts_fixed_array,
+    "timestamps_encode": case_timestamps_encode,
+    "timestamps_datetime": case_timestamps_datetime,
+    "timestamps_micros": case_timestamps_micros,
+    "timestamps_micros_array": case_timestamps_micros_array,
+    "updates_count_eager": case_updates_count_eager,
+    "updates_count_lazy": case_updates_count_lazy,
+    "updates_count_compact": case_updates_count_compact,
+    "updates_decode_serial": case_updates_decode_serial,
+    "updates_decode_pipeline": case_updates_decode_pipeline,
+}
+
+
+@contextlib.contextmanager
+def operation(setup):
+    op = setup()
+
+    if isinstance(op, contextlib.AbstractContextManager):
+        with op as op:
+            yield op
+    else:
+        yield op
+
+
+def run_case(setup, *, number=None, repeat=5):
+    with operation(setup) as op:
+        timer = timeit.Timer(op)
+        if number is None:
+            number, _ = timer.autorange()
+
+        best = min(timer.repeat(repeat=repeat, number=number))
+
+    return best / number * 1e6
+
+
+# Bytes retained per decoded event, for a stream of Asset creates with
+# empty blobs so that only the decoded representation is counted.
+def memory_per_event(decode, *, count=200, events=50):
+    responses = updates_responses(count, events, blob_bytes=0)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    decoded = [decode(u) for u in responses]
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del decoded
+
+    return (after - before) / (count * events)
+
+
+MEMORY_CASES = {
+    "eager": lambda: decode,
+    "compact": lambda: CompactDecoder().decode,
+}
+
+
+# Peak bytes allocated during one call of the operation, whether or not
+# they are still held when it returns: the allocator traffic it causes.
+def peak_bytes(setup):
+    with operation(setup) as op:
+        op()
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return peak
+
+
+def measure(name):
+    return {
+        "ns_per_op": round(run_case(CASES[name]) * 1000, 1),
+        "peak_bytes_per_op": peak_bytes(CASES[name]),
+    }
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"cases": {}}
+
+
+def record_baseline(path, names):
+    baseline = load_baseline(path)
+
+    baseline["python"] = platform.python_version()
+    baseline["machine"] = platform.machine()
+
+    for name in names:
+        baseline["cases"][name] = result = measure(name)
+        print(f"{name:28} {result['ns_per_op']:14,.1f} ns/op")
+
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _change(current, base):
+    return current / base - 1 if base else 0
+
+
+# Returns the names of the cases that regressed beyond the threshold.
+def check_baseline(path, names, threshold):
+    baseline = load_baseline(path)
+    regressed = []
+
+    # Timings from another Python release say nothing about this code.
+    recorded = baseline.get("python", "")
+    if recorded.split(".")[:2] != list(platform.python_version_tuple()[:2]):
+        sys.exit(
+            f"Baseline recorded with Python {recorded}, running "
+            f"{platform.python_version()}: re-record it (make bench-codec-baseline) "
+            "or run the project's .venv"
+        )
+
+    for name in names:
+        base = baseline["cases"].get(name)
+
+        if base is None:
+            print(f"{name:28} no baseline")
+            continue
+
+        result = measure(name)
+
+        # A slowdown has to reproduce, so one noisy run does not fail the
+        # gate.
+        if _change(result["ns_per_op"], base["ns_per_op"]) > threshold:
+            result["ns_per_op"] = min(
+                result["ns_per_op"], round(run_case(CASES[name]) * 1000, 1)
+            )
+
+        time_change = _change(result["ns_per_op"], base["ns_per_op"])
+        bytes_change = _change(result["peak_bytes_per_op"], base["peak_bytes_per_op"])
+
+        status = ""
+        if time_change > threshold or bytes_change > threshold:
+            status = "REGRESSED"
+            regressed.append(name)
+
+        print(
+            f"{name:28} {result['ns_per_op']:14,.1f} ns/op {time_change:+7.1%} "
+            f"{result['peak_bytes_per_op']:12,} B/op {bytes_change:+7.1%} {status}"
+        )
+
+    return regressed
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog="codec_bench")
+    parser.add_argument("cases", nargs="*")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--memory", action="store_true")
+    mode.add_argument("--record", action="store_true")
+    mode.add_argument("--check", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    opts = parser.parse_args(argv)
+
+    if opts.memory:
+        for name in opts.cases or list(MEMORY_CASES.keys()):
+            print(
+                f"{name:28} {memory_per_event(MEMORY_CASES[name]()):10.0f} bytes/event"
+            )
+        return
+
+    gated = [name for name in CASES if name not in UNGATED_CASES]
+
+    if opts.record:
+        record_baseline(opts.baseline, opts.cases or gated)
+    elif opts.check:
+        regressed = check_baseline(opts.baseline, opts.cases or gated, opts.threshold)
+
+        if regressed:
+            sys.exit(
+                f"{len(regressed)} case(s) regressed by more than "
+                f"{opts.threshold:.0%}: {', '.join(regressed)}"
+            )
+    else:
+        for name in opts.cases or list(CASES.keys()):
+            result = measure(name)
+            print(
+                f"{name:28} {result['ns_per_op']:14,.1f} ns/op "
+                f"{result['peak_bytes_per_op']:12,} B/op"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,33 +4,49 @@
 # Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
 # SPDX-License-Identifier: BSD0
 
+import argparse
+import datetime
 import decimal
-import grpc
+import itertools
 import pprint
 import sys
 import time
-import jwt
-import base64
 import json
 
 from dataclasses import dataclass
 
+from .codec import TemplateCodec
 from .util import FAIL, to_boolean
-
-from .ledger import create_contract, exercise_contract_choice
-from .value import Package, party
+from .value import Package, format_tid, party
 
 ASSET_MODEL = Package("#asset-model")
 
-ASSET_ID = ASSET_MODEL.id("Main", "Asset")
+# Mirrors template Asset in asset-model/daml/Main.daml. Used to encode
+# commands; events decode to Asset records only once it is registered
+# (see Config.codecDecode).
+ASSET = TemplateCodec(
+    ASSET_MODEL,
+    "Main",
+    "Asset",
+    {"issuer": "party", "owner": "party", "name": "text"},
+    choices={"Give": {"newOwner": "party"}},
+)
+
+ASSET_ID = ASSET.id
 
 #### Top level context
 
 
+OUTPUT_FORMATS = ["pretty", "ndjson"]
+
+
 @dataclass(frozen=True)
 class Context:
     config: "Config"
     ledger: "LedgerConnection"
+    output_format: "str" = "pretty"
+    # None keeps NdjsonWriter's default.
+    flush_interval_sec: "float | None" = None
 
     def lookup_local_party_id(self, party_name):
         party = self.ledger.lookup_local_party_id(party_name)
@@ -41,10 +57,26 @@ class Context:
             return party
 
 
-def init_context(config: "Config", ledger: "LedgerConnection") -> "Context":
+def init_context(
+    config: "Config",
+    ledger: "LedgerConnection",
+    *,
+    output_format="pretty",
+    flush_interval_sec=None,
+) -> "Context":
+    if output_format not in OUTPUT_FORMATS:
+        FAIL(
+            f"Unknown output format: {output_format} "
+            f"(expected one of {OUTPUT_FORMATS})"
+        )
+
     return Context(
         config=config,
         ledger=ledger,
+        output_format=output_format,
+        flush_interval_sec=(
+            None if flush_interval_sec is None else float(flush_interval_sec)
+        ),
     )
 
 
@@ -58,10 +90,6 @@ def format_cid(cid):
         return cid
 
 
-def format_tid(tid):
-    return f'{tid["module_name"]}:{tid["entity_name"]}'
-
-
 def show_output(txns):
     if isinstance(txns, list):
         for txn in txns:
@@ -71,6 +99,30 @@ def show_output(txns):
         show_output([txns])
 
 
+def show_output_stream(txns):
+    n = 0
+    for txn in txns:
+        pprint.pprint(txn)
+        n += 1
+    print("n=", n)
+
+
+# Writes a list or stream as NDJSON if that output format was selected,
+# otherwise shows it with show_pretty.
+def show_items(ctx, items, show_pretty):
+    if ctx.output_format == "ndjson":
+        from .output import NdjsonWriter
+
+        options = {}
+        if ctx.flush_interval_sec is not None:
+            options["flush_interval_sec"] = ctx.flush_interval_sec
+
+        with NdjsonWriter(sys.stdout, **options) as out:
+            out.write_all(items)
+    else:
+        show_pretty(items)
+
+
 def pprint_indented(v, width=80):
     string = pprint.pformat(v, width=width)
 
@@ -108,7 +160,12 @@ def cmd_ledger_end(ctx):
 def cmd_list_contracts(ctx, party_name):
     party = ctx.lookup_local_party_id(party_name)
 
-    show_output(ctx.ledger.get_active_contracts(party))
+    contracts = ctx.ledger.iter_active_contracts(party)
+
+    show_items(ctx, contracts, show_output_stream)
+
+    if ctx.output_format == "pretty":
+        print("offset=", contracts.offset)
 
 
 def show_transaction_stream(s, *, show_tx_fn=show_tx_events):
@@ -123,13 +180,38 @@ def show_transaction_stream(s, *, show_tx_fn=show_tx_events):
 def cmd_list_updates(ctx, party_name):
     party = ctx.lookup_local_party_id(party_name)
 
-    show_transaction_stream(ctx.ledger.get_updates(party))
+    show_items(ctx, ctx.ledger.get_updates(party), show_transaction_stream)
 
 
-def cmd_stream_updates(ctx, party_name):
+def cmd_stream_updates(ctx, party_name, checkpoint_file=None):
     party = ctx.lookup_local_party_id(party_name)
 
-    show_transaction_stream(ctx.ledger.get_update_stream(party))
+    if checkpoint_file:
+        stream = ctx.ledger.get_resumable_update_stream(party, checkpoint_file)
+    else:
+        stream = ctx.ledger.get_update_stream(party)
+
+    show_items(ctx, stream, show_transaction_stream)
+
+
+def cmd_export_updates(ctx, party_name, output_dir, format="parquet"):
+    from .export import export_updates
+
+    party = ctx.lookup_local_party_id(party_name)
+
+    offset, writer = export_updates(ctx.ledger, party, output_dir, format=format)
+
+    print(f"offset={offset} rows={writer.rows} files={writer.files}")
+
+
+def cmd_export_contracts(ctx, party_name, output_dir, format="parquet"):
+    from .export import export_contracts
+
+    party = ctx.lookup_local_party_id(party_name)
+
+    offset, writer = export_contracts(ctx.ledger, party, output_dir, format=format)
+
+    print(f"offset={offset} rows={writer.rows} files={writer.files}")
 
 
 def cmd_allocate_party(ctx, base_name):
@@ -145,7 +227,7 @@ def cmd_allocate_party(ctx, base_name):
 
 
 def cmd_list_parties(ctx):
-    show_output(ctx.ledger.get_ledger_parties())
+    show_items(ctx, ctx.ledger.get_ledger_parties(), show_output)
 
 
 def cmd_list_packages(ctx):
@@ -155,21 +237,57 @@ def cmd_list_local_parties(ctx):
     show_output(ctx.ledger.get_ledger_local_parties())
 
 def cmd_issue_asset(ctx, issuer, name):
+    from .ledger import create_contract
+
     issuer_party = ctx.ledger.lookup_local_party_id(issuer)
 
     return ctx.ledger.submit(
         issuer_party,
         create_contract(
             ASSET_ID,
-            {
-                "issuer": party(issuer_party),
-                "owner": party(issuer_party),
-                "name": name
-            }
+            ASSET(
+                issuer=party(issuer_party),
+                owner=party(issuer_party),
+                name=name,
+            ),
         ),
     )
 
+def cmd_bulk_issue_asset(ctx, issuer, count):
+    from .batching import BatchingSubmitter
+    from .ledger import create_prototype
+
+    issuer_party = ctx.ledger.lookup_local_party_id(issuer)
+
+    issue = create_prototype(
+        ASSET_ID,
+        ASSET(issuer=party(issuer_party), owner=party(issuer_party), name=""),
+    )
+
+    start = time.monotonic()
+
+    with BatchingSubmitter(ctx.ledger) as batcher:
+        futures = [
+            batcher.submit(issuer_party, issue(name=f"asset-{n}"))
+            for n in range(int(count))
+        ]
+
+        failed = [f.exception() for f in futures if f.exception() is not None]
+
+    elapsed = time.monotonic() - start
+
+    for e in failed[:5]:
+        print("failed:", e)
+
+    print(
+        f"issued={len(futures) - len(failed)} failed={len(failed)} "
+        f"transactions={batcher.transactions} fallbacks={batcher.fallbacks} "
+        f"elapsed={elapsed:.3f}s rate={len(futures) / elapsed:.1f}/s"
+    )
+
 def cmd_give_asset(ctx, asset_cid, owner, new_owner):
+    from .ledger import exercise_contract_choice
+
     owner_party = ctx.ledger.lookup_local_party_id(owner)
     new_owner_party = ctx.ledger.lookup_local_party_id(new_owner)
 
@@ -179,13 +297,13 @@ def cmd_give_asset(ctx, asset_cid, owner, new_owner):
             ASSET_ID,
             asset_cid,
             "Give",
-            {
-                "newOwner": party(new_owner_party)
-            }
+            ASSET.choices["Give"](newOwner=party(new_owner_party)),
         ),
     )
 
 def cmd_archive_asset(ctx, asset_cid, issuer):
+    from .ledger import exercise_contract_choice
+
     issuer_party = ctx.ledger.lookup_local_party_id(issuer)
 
     return ctx.ledger.submit(
@@ -194,10 +312,86 @@ def cmd_archive_asset(ctx, asset_cid, issuer):
             ASSET_ID,
             asset_cid,
             "Archive",
-            {
-            }
+            ASSET.choices["Archive"](),
+        ),
+    )
+
+
+def created_contract_id(tx):
+    return next(e["contract_id"] for e in tx["events"] if e["event"] == "created")
+
+
+BENCH_STEPS = ["issue-asset", "give-asset", "archive-asset"]
+
+
+# Runs the asset workflow (issue to self, give to receiver, archive) under
+# load and reports latency per step. Without --rate, each of the
+# --concurrency threads starts its next workflow as soon as the last one
+# completes; with it, workflows start at that fixed rate per second.
+def cmd_bench(ctx, *args):
+    from .ledger import create_prototype, exercise_prototype
+    from .load import run_load
+
+    parser = argparse.ArgumentParser(prog="bench")
+    parser.add_argument("issuer")
+    parser.add_argument("receiver")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--rate", type=float, default=None)
+    parser.add_argument("--summary", default="bench-summary.json")
+    opts = parser.parse_args(args)
+
+    issuer_party = ctx.lookup_local_party_id(opts.issuer)
+    receiver_party = ctx.lookup_local_party_id(opts.receiver)
+
+    issue = create_prototype(
+        ASSET_ID,
+        ASSET(issuer=party(issuer_party), owner=party(issuer_party), name=""),
+    )
+    give = exercise_prototype(
+        ASSET_ID, "Give", ASSET.choices["Give"](newOwner=party(receiver_party))
+    )
+    archive = exercise_prototype(ASSET_ID, "Archive", ASSET.choices["Archive"]())
+
+    names = itertools.count()
+
+    def asset_workflow(step):
+        submit = ctx.ledger.submit
+
+        name = f"bench-{next(names)}"
+
+        tx = step("issue-asset", submit, issuer_party, issue(name=name))
+        tx = step("give-asset", submit, issuer_party, give(created_contract_id(tx)))
+        step("archive-asset", submit, issuer_party, archive(created_contract_id(tx)))
+
+    summary = {
+        "workflow": BENCH_STEPS,
+        "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        **run_load(
+            asset_workflow,
+            concurrency=opts.concurrency,
+            duration_sec=opts.duration,
+            warmup_sec=opts.warmup,
+            rate=opts.rate,
         ),
+    }
+
+    print(
+        f"{'step':<15} {'count':>8} {'errors':>7} {'per sec':>9} "
+        f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
     )
+    for name in [*BENCH_STEPS, "iteration"]:
+        s = summary["steps"].get(name)
 
+        if s is not None:
+            print(
+                f"{name:<15} {s['count']:>8} {sum(s['errors'].values()):>7} "
+                f"{s['throughput_per_sec']:>9.1f} {s['p50_ms']:>9.2f} "
+                f"{s['p90_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['max_ms']:>9.2f}"
+            )
 
+    with open(opts.summary, "w") as f:
+        json.dump(summary, f, indent=2)
 
+    print("summary=", opts.summary)
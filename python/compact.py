@@ -0,0 +1,333 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Compact alternative to the dicts produced by decode(). Events and
+# transactions are __slots__ objects, and the values a long stream keeps
+# repeating (parties, party lists, template ids, package names) are
+# interned, so each distinct value exists once however many events
+# refer to it. Objects support evt["field"] and evt.get() so code written
+# against the dicts keeps working.
+
+import com.daml.ledger.api.v2.event_pb2 as event_pb2
+import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
+import com.daml.ledger.api.v2.transaction_pb2 as transaction_pb2
+import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+
+from .value import (
+    DECODE_FAIL,
+    Party,
+    decode_create_arguments,
+    decode_value_any_depth,
+)
+
+
+class Compact:
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, k) == getattr(other, k) for k in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+
+        return f"{type(self).__name__}({fields})"
+
+
+class TemplateId(Compact):
+    __slots__ = ("package_id", "module_name", "entity_name")
+
+    def __init__(self, package_id, module_name, entity_name):
+        self.package_id = package_id
+        self.module_name = module_name
+        self.entity_name = entity_name
+
+    def __hash__(self):
+        return hash((self.package_id, self.module_name, self.entity_name))
+
+
+class ArchivedEvent(Compact):
+    __slots__ = (
+        "offset",
+        "node_id",
+        "contract_id",
+        "template_id",
+        "witness_parties",
+        "package_name",
+    )
+
+    event = "archived"
+
+    def __init__(
+        self,
+        offset,
+        node_id,
+        contract_id,
+        template_id,
+        witness_parties,
+        package_name,
+    ):
+        self.offset = offset
+        self.node_id = node_id
+        self.contract_id = contract_id
+        self.template_id = template_id
+        self.witness_parties = witness_parties
+        self.package_name = package_name
+
+
+class CreatedEvent(Compact):
+    __slots__ = (
+        "offset",
+        "node_id",
+        "contract_id",
+        "template_id",
+        "witness_parties",
+        "signatories",
+        "observers",
+        "package_name",
+        "interface_views",
+        "create_arguments",
+        "created_event_blob",
+        "reassignment_counter",
+    )
+
+    event = "created"
+
+    def __init__(
+        self,
+        offset,
+        node_id,
+        contract_id,
+        template_id,
+        witness_parties,
+        signatories,
+        observers,
+        package_name,
+        interface_views,
+        create_arguments,
+        created_event_blob,
+        reassignment_counter,
+    ):
+        self.offset = offset
+        self.node_id = node_id
+        self.contract_id = contract_id
+        self.template_id = template_id
+        self.witness_parties = witness_parties
+        self.signatories = signatories
+        self.observers = observers
+        self.package_name = package_name
+        self.interface_views = interface_views
+        self.create_arguments = create_arguments
+        self.created_event_blob = created_event_blob
+        self.reassignment_counter = reassignment_counter
+
+
+class ExercisedEvent(Compact):
+    __slots__ = (
+        "offset",
+        "node_id",
+        "last_descendant_node_id",
+        "contract_id",
+        "template_id",
+        "choice",
+        "choice_argument",
+        "acting_parties",
+        "consuming",
+        "witness_parties",
+        "exercise_result",
+        "package_name",
+    )
+
+    event = "exercised"
+
+    def __init__(
+        self,
+        offset,
+        node_id,
+        last_descendant_node_id,
+        contract_id,
+        template_id,
+        choice,
+        choice_argument,
+        acting_parties,
+        consuming,
+        witness_parties,
+        exercise_result,
+        package_name,
+    ):
+        self.offset = offset
+        self.node_id = node_id
+        self.last_descendant_node_id = last_descendant_node_id
+        self.contract_id = contract_id
+        self.template_id = template_id
+        self.choice = choice
+        self.choice_argument = choice_argument
+        self.acting_parties = acting_parties
+        self.consuming = consuming
+        self.witness_parties = witness_parties
+        self.exercise_result = exercise_result
+        self.package_name = package_name
+
+
+class Transaction(Compact):
+    __slots__ = ("update_id", "command_id", "workflow_id", "offset", "events")
+
+    def __init__(self, update_id, command_id, workflow_id, offset, events):
+        self.update_id = update_id
+        self.command_id = command_id
+        self.workflow_id = workflow_id
+        self.offset = offset
+        self.events = events
+
+
+# Decodes into the compact model. Interned values live as long as the
+# decoder, so use one decoder per stream or connection rather than one
+# per message.
+class CompactDecoder:
+    def __init__(self):
+        self._strings = {}
+        self._parties = {}
+        self._party_lists = {(): ()}
+        self._template_ids = {}
+
+        self._decoders = {
+            state_service_pb2.ActiveContract: self.decode_active_contract,
+            event_pb2.ArchivedEvent: self.decode_archived_event,
+            event_pb2.CreatedEvent: self.decode_created_event,
+            event_pb2.ExercisedEvent: self.decode_exercised_event,
+            event_pb2.Event: self.decode_event,
+            transaction_pb2.Transaction: self.decode_transaction,
+            update_service_pb2.GetUpdatesResponse: self.decode_updates_response,
+            update_service_pb2.GetTransactionResponse: self._decode_response,
+        }
+        self._event_decoders = {
+            "created": self.decode_created_event,
+            "archived": self.decode_archived_event,
+            "exercised": self.decode_exercised_event,
+        }
+
+    def string(self, s):
+        return self._strings.setdefault(s, s)
+
+    def party(self, p):
+        party = self._parties.get(p)
+
+        if party is None:
+            party = self._parties[p] = Party(party=p)
+
+        return party
+
+    def party_list(self, parties):
+        key = tuple(parties)
+        party_list = self._party_lists.get(key)
+
+        if party_list is None:
+            party_list = self._party_lists[key] = tuple(self.party(p) for p in key)
+
+        return party_list
+
+    def template_id(self, v):
+        key = (v.package_id, v.module_name, v.entity_name)
+        tid = self._template_ids.get(key)
+
+        if tid is None:
+            tid = self._template_ids[key] = TemplateId(*key)
+
+        return tid
+
+    def decode_archived_event(self, v):
+        return ArchivedEvent(
+            v.offset,
+            v.node_id,
+            v.contract_id,
+            self.template_id(v.template_id),
+            self.party_list(v.witness_parties),
+            self.string(v.package_name),
+        )
+
+    def decode_created_event(self, v, reassignment_counter=None):
+        return CreatedEvent(
+            v.offset,
+            v.node_id,
+            v.contract_id,
+            self.template_id(v.template_id),
+            self.party_list(v.witness_parties),
+            self.party_list(v.signatories),
+            self.party_list(v.observers),
+            self.string(v.package_name),
+            list(v.interface_views) if v.interface_views else (),
+            decode_create_arguments(v),
+            v.created_event_blob,
+            reassignment_counter,
+        )
+
+    def decode_exercised_event(self, v):
+        return ExercisedEvent(
+            v.offset,
+            v.node_id,
+            v.last_descendant_node_id,
+            v.contract_id,
+            self.template_id(v.template_id),
+            self.string(v.choice),
+            decode_value_any_depth(v.choice_argument),
+            self.party_list(v.acting_parties),
+            v.consuming,
+            self.party_list(v.witness_parties),
+            decode_value_any_depth(v.exercise_result),
+            self.string(v.package_name),
+        )
+
+    def decode_active_contract(self, v):
+        return self.decode_created_event(v.created_event, v.reassignment_counter)
+
+    def decode_event(self, v):
+        kind = v.WhichOneof("event")
+        decoder = self._event_decoders.get(kind)
+
+        if decoder is None:
+            DECODE_FAIL(v)
+        else:
+            return decoder(getattr(v, kind))
+
+    def decode_transaction(self, v):
+        return Transaction(
+            v.update_id,
+            v.command_id,
+            v.workflow_id,
+            v.offset,
+            tuple(self.decode_event(e) for e in v.events),
+        )
+
+    def decode_updates_response(self, v):
+        kind = v.WhichOneof("update")
+
+        if kind == "transaction":
+            return self.decode_transaction(v.transaction)
+        elif kind == "reassignment":
+            DECODE_FAIL(v, "domain reassignments not currently supported")
+        else:
+            DECODE_FAIL(v)
+
+    def _decode_response(self, v):
+        return self.decode_transaction(v.transaction)
+
+    def decode(self, v):
+        decoder = self._decoders.get(type(v))
+
+        if decoder is None:
+            DECODE_FAIL(v)
+        else:
+            return decoder(v)
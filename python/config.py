@@ -8,7 +8,7 @@ import json
 import os
 
 from dacite import from_dict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from mergedeep import merge
 from pathlib import Path
 from typing import Optional
@@ -17,9 +17,52 @@ from .util import FAIL
 from .value import NumericStr
 
 
+@dataclass(frozen=True)
+class ChannelConfig:
+    maxReceiveMessageLength: "Optional[int]" = 64 * 1024 * 1024
+    maxSendMessageLength: "Optional[int]" = None
+    keepaliveTimeMs: "Optional[int]" = None
+    keepaliveTimeoutMs: "Optional[int]" = None
+    keepalivePermitWithoutCalls: "bool" = False
+    http2LookaheadBytes: "Optional[int]" = None
+    http2BdpProbe: "bool" = True
+    http2MaxFrameSize: "Optional[int]" = None
+    # Per call type ("query", "submit", "stream") compression algorithm:
+    # "gzip", "deflate" or "none".
+    compression: "dict" = field(default_factory=dict)
+    poolSize: "int" = 1
+
+
+@dataclass(frozen=True)
+class RetryConfig:
+    maxAttempts: "int" = 5
+    initialBackoffSec: "float" = 0.1
+    maxBackoffSec: "float" = 10.0
+    callTimeoutSec: "Optional[float]" = None
+    totalTimeoutSec: "Optional[float]" = None
+
+
+# Scalar representation of decoded values; see decoder.Decoder.
+@dataclass(frozen=True)
+class DecodeConfig:
+    numeric: "str" = "decimal"
+    numericScale: "int" = 10
+    timestamp: "str" = "datetime"
+    arrays: "bool" = False
+
+
 @dataclass(frozen=True)
 class Config:
     ledgerAddress: "str"
+    partyCacheTtlSec: "float" = 60.0
+    channel: "ChannelConfig" = field(default_factory=ChannelConfig)
+    retry: "Optional[RetryConfig]" = None
+    lazyDecode: "bool" = False
+    compactDecode: "bool" = False
+    # Decode Asset create arguments to typed records rather than dicts.
+    codecDecode: "bool" = False
+    decode: "Optional[DecodeConfig]" = None
+    decodeWorkers: "int" = 0
 
 
 def load_json(filename: str):
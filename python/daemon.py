@@ -0,0 +1,402 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# A long-lived process that runs CLI commands on behalf of ./run, so a
+# command does not pay for interpreter startup, the generated protobuf
+# imports and a new ledger channel each time.
+#
+# With CLI_DAEMON=1 in the environment, ./run forwards its arguments over
+# a Unix socket (CLI_DAEMON_SOCKET, default target/cli-daemon.sock) and
+# relays the command's output and exit status, starting the daemon first
+# if it is not running. The daemon runs commands one at a time with the
+# client's working directory, and exits after an hour idle, on
+# `./run daemon stop`, or when config.json, EXTRA_CONFIG or the program's
+# source has changed since it started (the client then starts a fresh
+# one and retries). A command whose client disconnects (e.g. on Ctrl-C)
+# is interrupted with KeyboardInterrupt, as it would be if run directly.
+#
+# This module is imported by the client before anything else, so it only
+# uses the standard library.
+
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from pathlib import Path
+
+DAEMON_ENV = "CLI_DAEMON"
+SOCKET_ENV = "CLI_DAEMON_SOCKET"
+
+DEFAULT_SOCKET_PATH = "target/cli-daemon.sock"
+DEFAULT_IDLE_TIMEOUT_SEC = 3600
+START_TIMEOUT_SEC = 60
+
+# Reply frames: a kind byte and payload length, then the payload.
+FRAME_HEADER = struct.Struct(">cI")
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+RESTART = b"r"
+
+
+def daemon_enabled():
+    return os.environ.get(DAEMON_ENV, "") not in ("", "0")
+
+
+def socket_path():
+    return os.path.abspath(os.environ.get(SOCKET_ENV, DEFAULT_SOCKET_PATH))
+
+
+def _send_frame(sock, kind, payload=b""):
+    sock.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv_exactly(sock, n):
+    data = b""
+
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+
+        if not chunk:
+            raise ConnectionError("Daemon closed the connection")
+
+        data += chunk
+
+    return data
+
+
+# What the daemon's state was built from. A daemon that finds this has
+# changed since it started is stale. Paths are resolved against the
+# daemon's own directory, not the process's current one, which follows
+# whatever command is running.
+def _source_stamp(extra_config, cwd):
+    paths = [
+        Path(cwd, "config.json"),
+        *sorted(Path(__file__).resolve().parent.glob("*.py")),
+    ]
+
+    if extra_config:
+        paths.append(Path(cwd, extra_config))
+
+    return [extra_config, *(p.stat().st_mtime_ns if p.exists() else 0 for p in paths)]
+
+
+#### Server
+
+
+# Text stream that sends what is written to the client as frames.
+class _FrameWriter:
+    encoding = "utf-8"
+
+    def __init__(self, sock, kind):
+        self.sock = sock
+        self.kind = kind
+
+    def write(self, s):
+        if s:
+            _send_frame(self.sock, self.kind, s.encode(self.encoding))
+
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+# Raises KeyboardInterrupt in the thread running a command once its
+# client has gone, the next time that thread runs Python code.
+class _Interrupter:
+    def __init__(self, sock):
+        self.sock = sock
+
+        self._lock = threading.Lock()
+        self._thread_id = None
+
+    def __enter__(self):
+        with self._lock:
+            self._thread_id = threading.get_ident()
+
+        threading.Thread(target=self._watch, daemon=True).start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self._thread_id = None
+
+    # The client sends nothing after its request, so recv() returns
+    # once it closes the connection.
+    def _watch(self):
+        import ctypes
+
+        with contextlib.suppress(OSError):
+            self.sock.recv(1)
+
+        with self._lock:
+            if self._thread_id is not None:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._thread_id), ctypes.py_object(KeyboardInterrupt)
+                )
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server
+        daemon.last_active = time.monotonic()
+
+        line = self.rfile.readline()
+
+        # Connections that close without a request are liveness probes.
+        if not line:
+            return
+
+        request = json.loads(line)
+
+        # Stopping does not wait for a running command.
+        if request.get("stop"):
+            _send_frame(self.request, EXIT, b"0")
+            daemon.stop()
+        elif daemon.stopping:
+            _send_frame(self.request, RESTART)
+        elif _source_stamp(request.get("extra_config"), daemon.cwd) != daemon.stamp:
+            _send_frame(self.request, RESTART)
+            daemon.stop()
+        else:
+            with daemon.command_lock:
+                if daemon.stopping:
+                    _send_frame(self.request, RESTART)
+                else:
+                    status = self._run(daemon, request)
+
+                    # The client may have gone, e.g. after Ctrl-C.
+                    with contextlib.suppress(ConnectionError):
+                        _send_frame(self.request, EXIT, str(status).encode())
+
+                daemon.last_active = time.monotonic()
+
+    def _run(self, daemon, request):
+        stdout = _FrameWriter(self.request, STDOUT)
+        stderr = _FrameWriter(self.request, STDERR)
+
+        os.chdir(request["cwd"])
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    with _Interrupter(self.request):
+                        daemon.run_command(request["argv"])
+                    return 0
+                except SystemExit as e:
+                    if isinstance(e.code, str):
+                        print(e.code, file=stderr)
+                        return 1
+
+                    return e.code or 0
+                except KeyboardInterrupt:
+                    return 130
+                except (BrokenPipeError, ConnectionError):
+                    return 1
+                except Exception:
+                    traceback.print_exc(file=stderr)
+                    return 1
+        except KeyboardInterrupt:
+            # Raised just as the command finished.
+            return 130
+        finally:
+            os.chdir(daemon.cwd)
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, run_command, idle_timeout_sec):
+        super().__init__(path, _RequestHandler)
+
+        self.path = path
+        self.run_command = run_command
+        self.idle_timeout_sec = idle_timeout_sec
+
+        self.cwd = os.getcwd()
+        self.stamp = _source_stamp(os.environ.get("EXTRA_CONFIG"), self.cwd)
+        self.command_lock = threading.Lock()
+        self.last_active = time.monotonic()
+        self.stopping = False
+        self.inode = os.stat(path).st_ino
+
+    # Unlinks the socket first, so that new clients start a fresh daemon
+    # rather than queue on this one while it shuts down.
+    def stop(self):
+        self.stopping = True
+        self.unlink()
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    # Leaves the socket of a daemon that has replaced this one.
+    def unlink(self):
+        with contextlib.suppress(FileNotFoundError):
+            if os.stat(self.path).st_ino == self.inode:
+                os.unlink(self.path)
+
+    def watch_idle(self):
+        while True:
+            time.sleep(min(60, self.idle_timeout_sec))
+
+            idle = time.monotonic() - self.last_active
+            if idle >= self.idle_timeout_sec and not self.command_lock.locked():
+                self.stop()
+                return
+
+
+def _socket_in_use(path):
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+
+
+# Serves run_command(argv) on the socket at path until stopped or idle.
+def serve(path, run_command, *, idle_timeout_sec=DEFAULT_IDLE_TIMEOUT_SEC):
+    if _socket_in_use(path):
+        print(f"Daemon already running on {path}", file=sys.stderr)
+        return
+
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    with _DaemonServer(path, run_command, idle_timeout_sec) as server:
+        threading.Thread(target=server.watch_idle, daemon=True).start()
+
+        print(f"Daemon listening on {path}", flush=True)
+
+        try:
+            server.serve_forever()
+        finally:
+            server.unlink()
+
+
+#### Client
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX)
+
+    try:
+        sock.connect(path)
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def _start_daemon(path):
+    log_path = Path(path).with_suffix(".log")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    env = dict(os.environ, **{SOCKET_ENV: path})
+    env.pop(DAEMON_ENV, None)
+
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", __package__, "daemon"],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT_SEC
+
+    while time.monotonic() < deadline:
+        sock = _connect(path)
+
+        if sock is not None:
+            return sock
+        elif process.poll() is not None:
+            break
+
+        time.sleep(0.05)
+
+    sys.exit(f"Daemon failed to start; see {log_path}")
+
+
+def _connect_or_start(path):
+    return _connect(path) or _start_daemon(path)
+
+
+# Relays the reply frames to this process's stdout and stderr, returning
+# the exit status, or None if the daemon was stale and has exited.
+def _relay(sock):
+    outputs = {STDOUT: sys.stdout.buffer, STDERR: sys.stderr.buffer}
+
+    while True:
+        kind, length = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+        payload = _recv_exactly(sock, length)
+
+        if kind == EXIT:
+            return int(payload)
+        elif kind == RESTART:
+            return None
+        else:
+            outputs[kind].write(payload)
+            outputs[kind].flush()
+
+
+def _request(path, request):
+    with _connect_or_start(path) as sock:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+
+        return _relay(sock)
+
+
+# Runs the command in argv on the daemon, returning its exit status.
+def forward(argv):
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "extra_config": os.environ.get("EXTRA_CONFIG"),
+    }
+    path = socket_path()
+
+    try:
+        status = _request(path, request)
+        deadline = time.monotonic() + START_TIMEOUT_SEC
+
+        # Retry until the stale daemon has gone and a fresh one (ours or
+        # another client's) runs the command.
+        while status is None:
+            if time.monotonic() >= deadline:
+                sys.exit(f"Stale daemon on {path} did not exit")
+
+            time.sleep(0.05)
+            status = _request(path, request)
+
+        return status
+    except KeyboardInterrupt:
+        return 130
+
+
+def stop(path):
+    sock = _connect(path)
+
+    if sock is None:
+        print(f"No daemon running on {path}")
+    else:
+        with sock:
+            sock.sendall(json.dumps({"stop": True}).encode() + b"\n")
+            _relay(sock)
@@ -0,0 +1,278 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Decoding with a choice of scalar representation. decode() returns
+# numerics as Decimal and timestamps as datetime; a Decoder produces the
+# same dicts, but with
+#
+#   numeric="decimal"     decimal.Decimal, as decode()
+#   numeric="fixed"       int scaled by 10**numeric_scale, so with the
+#                         default scale of 10 "1.25" becomes 12500000000
+#   numeric="str"         the string sent by the ledger
+#
+#   timestamp="datetime"  UTC datetime, as decode()
+#   timestamp="micros"    int microseconds since the epoch
+#
+# With arrays=True, a list whose elements are all bool, int64, fixed
+# numerics or timestamps is returned as a NumPy array (timestamps as
+# int64 micros or datetime64[us], per the timestamp policy). numpy is
+# optional and only imported when arrays are enabled.
+#
+# Create arguments are always decoded generically: template codecs fix
+# the representation of their fields, so they are not used here.
+
+import decimal
+
+import com.daml.ledger.api.v2.command_service_pb2 as command_service_pb2
+import com.daml.ledger.api.v2.completion_pb2 as completion_pb2
+import com.daml.ledger.api.v2.event_pb2 as event_pb2
+import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
+import com.daml.ledger.api.v2.transaction_pb2 as transaction_pb2
+import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+import com.daml.ledger.api.v2.value_pb2 as value_pb2
+
+from .util import FAIL
+from .value import (
+    DECODE_FAIL,
+    VALUE_DECODERS,
+    active_contract_dict,
+    created_event_dict,
+    decode_archived_event,
+    decode_completion,
+    decode_identifier,
+    decode_timestamp,
+    event_dict,
+    exercised_event_dict,
+    get_tuple_arity,
+    transaction_dict,
+    updates_response_dict,
+)
+
+DEFAULT_NUMERIC_SCALE = 10
+
+
+def _identity(v):
+    return v
+
+
+# Converts a numeric string to an int scaled by 10**scale, without going
+# through Decimal. Digits beyond the scale are an error rather than being
+# rounded away.
+def fixed_point_decoder(scale):
+    def decode_fixed(v):
+        whole, _, fraction = v.partition(".")
+
+        if len(fraction) == scale:
+            return int(whole + fraction)
+        elif len(fraction) > scale:
+            if fraction[scale:].strip("0"):
+                FAIL(f"Numeric {v} has more than {scale} decimal places")
+
+            fraction = fraction[:scale]
+
+        return int(whole + fraction.ljust(scale, "0"))
+
+    return decode_fixed
+
+
+NUMERIC_POLICIES = {
+    "decimal": lambda scale: decimal.Decimal,
+    "fixed": fixed_point_decoder,
+    "str": lambda scale: _identity,
+}
+
+TIMESTAMP_POLICIES = {
+    "datetime": decode_timestamp,
+    "micros": _identity,
+}
+
+
+class Decoder:
+    def __init__(
+        self,
+        *,
+        numeric="decimal",
+        numeric_scale=DEFAULT_NUMERIC_SCALE,
+        timestamp="datetime",
+        arrays=False,
+    ):
+        if numeric not in NUMERIC_POLICIES:
+            FAIL(
+                f"Unknown numeric policy: {numeric} "
+                f"(expected one of {list(NUMERIC_POLICIES)})"
+            )
+        if timestamp not in TIMESTAMP_POLICIES:
+            FAIL(
+                f"Unknown timestamp policy: {timestamp} "
+                f"(expected one of {list(TIMESTAMP_POLICIES)})"
+            )
+
+        self.numeric = numeric
+        self.timestamp = timestamp
+
+        self._value_decoders = {
+            **VALUE_DECODERS,
+            "numeric": NUMERIC_POLICIES[numeric](numeric_scale),
+            "timestamp": TIMESTAMP_POLICIES[timestamp],
+            "optional": self.decode_optional,
+            "gen_map": self.decode_genmap,
+            "list": self.decode_list,
+            "record": self.decode_record,
+        }
+
+        self._array_dtypes = self._load_array_dtypes() if arrays else {}
+
+        self._decoders = {
+            state_service_pb2.ActiveContract: self.decode_active_contract,
+            event_pb2.ArchivedEvent: decode_archived_event,
+            event_pb2.CreatedEvent: self.decode_created_event,
+            event_pb2.ExercisedEvent: self.decode_exercised_event,
+            value_pb2.Identifier: decode_identifier,
+            value_pb2.Record: self.decode_record,
+            value_pb2.List: self.decode_list,
+            value_pb2.Value: self.decode_value,
+            event_pb2.Event: self.decode_event,
+            transaction_pb2.Transaction: self.decode_transaction,
+            command_service_pb2.SubmitAndWaitForTransactionResponse: self._decode_response,
+            update_service_pb2.GetUpdatesResponse: self.decode_updates_response,
+            update_service_pb2.GetTransactionResponse: self._decode_response,
+            completion_pb2.Completion: decode_completion,
+        }
+        self._event_decoders = {
+            "created": self.decode_created_event,
+            "archived": decode_archived_event,
+            "exercised": self.decode_exercised_event,
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            numeric=config.numeric,
+            numeric_scale=config.numericScale,
+            timestamp=config.timestamp,
+            arrays=config.arrays,
+        )
+
+    # Element kinds that become arrays, with the NumPy dtype for each under
+    # this decoder's policies.
+    def _load_array_dtypes(self):
+        try:
+            import numpy
+        except ImportError:
+            FAIL("Array decoding requires numpy (pip install numpy)")
+
+        self._numpy = numpy
+
+        dtypes = {"bool": numpy.bool_, "int64": numpy.int64}
+
+        if self.numeric == "fixed":
+            dtypes["numeric"] = numpy.int64
+
+        if self.timestamp == "micros":
+            dtypes["timestamp"] = numpy.int64
+        else:
+            dtypes["timestamp"] = numpy.dtype("datetime64[us]")
+
+        return dtypes
+
+    def decode_value(self, v):
+        kind = v.WhichOneof("sum")
+        decoder = self._value_decoders.get(kind)
+
+        if decoder is None:
+            return v
+        else:
+            return decoder(getattr(v, kind))
+
+    def decode_optional(self, v):
+        if v.HasField("value"):
+            return self.decode_value(v.value)
+        else:
+            return None
+
+    def decode_genmap(self, v):
+        return {self.decode_value(e.key): self.decode_value(e.value) for e in v.entries}
+
+    def decode_list(self, v):
+        elements = v.elements
+
+        if self._array_dtypes and elements:
+            array = self._decode_array(elements)
+
+            if array is not None:
+                return array
+
+        return [self.decode_value(e) for e in elements]
+
+    # Returns None if the elements are not all of one array kind, or a
+    # fixed numeric does not fit in an int64.
+    def _decode_array(self, elements):
+        kind = elements[0].WhichOneof("sum")
+        dtype = self._array_dtypes.get(kind)
+
+        if dtype is None:
+            return None
+
+        values = []
+        for e in elements:
+            if e.WhichOneof("sum") != kind:
+                return None
+
+            values.append(getattr(e, kind))
+
+        # Timestamps go into the array as micros whatever the policy;
+        # datetime64[us] takes them as they are.
+        if kind == "numeric":
+            values = map(self._value_decoders["numeric"], values)
+
+        try:
+            return self._numpy.fromiter(values, dtype=dtype, count=len(elements))
+        except OverflowError:
+            return None
+
+    def decode_record(self, v):
+        tuple_arity = get_tuple_arity(v.record_id)
+
+        record_dict = {f.label: self.decode_value(f.value) for f in v.fields}
+
+        if tuple_arity:
+            return tuple(
+                [record_dict[f"_{index}"] for index in range(1, tuple_arity + 1)]
+            )
+        else:
+            return record_dict
+
+    def _decode_create_arguments(self, v):
+        return self.decode_record(v.create_arguments)
+
+    def decode_created_event(self, v):
+        return created_event_dict(v, self._decode_create_arguments)
+
+    def decode_exercised_event(self, v):
+        return exercised_event_dict(v, self.decode_value)
+
+    def decode_active_contract(self, v):
+        return active_contract_dict(v, self.decode_created_event)
+
+    def decode_event(self, v):
+        return event_dict(v, self._event_decoders)
+
+    def decode_transaction(self, v):
+        return transaction_dict(v, self.decode_event)
+
+    def decode_updates_response(self, v):
+        return updates_response_dict(v, self.decode_transaction)
+
+    def _decode_response(self, v):
+        return self.decode_transaction(v.transaction)
+
+    def decode(self, v):
+        decoder = self._decoders.get(type(v))
+
+        if decoder is None:
+            DECODE_FAIL(v)
+        else:
+            return decoder(v)
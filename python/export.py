@@ -0,0 +1,311 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Columnar export of update history and active contracts. Rows are built
+# straight from the protobuf messages, one per event or contract, into
+# column lists of at most batch_rows rows. Each full batch is written to
+# its own file (part-NNNNN.parquet or .npz) and dropped, so memory stays
+# bounded by the batch size however long the stream is.
+#
+# pyarrow (parquet) and numpy (npz) are only imported when the
+# corresponding format is used, to keep them out of every command's
+# startup.
+
+from pathlib import Path
+
+from .util import FAIL
+from .value import decode_value
+
+DEFAULT_BATCH_ROWS = 65536
+
+ARGUMENT_PREFIX = "arg."
+
+
+def _scalar(v, kind):
+    return getattr(v, kind)
+
+
+def _optional(v, kind):
+    if v.optional.HasField("value"):
+        return column_value(v.optional.value)
+    else:
+        return None
+
+
+# Value kinds stored as native column values; anything else (lists, maps,
+# variants, ...) is stored as the text of its decoded form.
+COLUMN_VALUES = {
+    "bool": _scalar,
+    "int64": _scalar,
+    "text": _scalar,
+    "party": _scalar,
+    "contract_id": _scalar,
+    "numeric": _scalar,
+    "timestamp": _scalar,
+    "date": _scalar,
+    "optional": _optional,
+    "enum": lambda v, kind: v.enum.constructor,
+}
+
+
+def column_value(v):
+    kind = v.WhichOneof("sum")
+    column_value_fn = COLUMN_VALUES.get(kind)
+
+    if column_value_fn is None:
+        return str(decode_value(v))
+    else:
+        return column_value_fn(v, kind)
+
+
+# Nested records flatten into dotted column names, e.g. arg.terms.amount.
+def flatten_record(record, row, prefix=ARGUMENT_PREFIX):
+    for f in record.fields:
+        if f.value.WhichOneof("sum") == "record":
+            flatten_record(f.value.record, row, f"{prefix}{f.label}.")
+        else:
+            row[prefix + f.label] = column_value(f.value)
+
+
+def _template(tid):
+    return f"{tid.module_name}:{tid.entity_name}"
+
+
+def event_row(tx, evt):
+    kind = evt.WhichOneof("event")
+    e = getattr(evt, kind)
+
+    row = {
+        "offset": tx.offset,
+        "update_id": tx.update_id,
+        "command_id": tx.command_id,
+        "event": kind,
+        "template": _template(e.template_id),
+        "contract_id": e.contract_id,
+    }
+
+    if kind == "created":
+        flatten_record(e.create_arguments, row)
+
+    return row
+
+
+def contract_row(c):
+    e = c.created_event
+
+    row = {
+        "offset": e.offset,
+        "update_id": None,
+        "command_id": None,
+        "event": "created",
+        "template": _template(e.template_id),
+        "contract_id": e.contract_id,
+    }
+
+    flatten_record(e.create_arguments, row)
+
+    return row
+
+
+# A column whose values differ in type across templates (e.g. a text
+# field in one and an int64 field in another) is stored as text.
+def _arrow_array(pyarrow, values):
+    try:
+        return pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        return pyarrow.array([None if v is None else str(v) for v in values])
+
+
+def _merged_type(pyarrow, a, b):
+    if a == b or pyarrow.types.is_null(b):
+        return a
+    elif pyarrow.types.is_null(a):
+        return b
+    else:
+        return pyarrow.string()
+
+
+# Parquet parts share one schema, so the export reads back as a single
+# pyarrow.dataset. The schema grows as batches bring new columns, or
+# types that conflict with earlier ones (stored as text from then on), and
+# parts written before it last changed are rewritten with it on close.
+class ParquetParts:
+    def __init__(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            FAIL("Parquet export requires pyarrow (run make build)")
+
+        self.pyarrow = pyarrow
+        self.schema = None
+
+        self._written = []
+
+    def _merge_schema(self, schema):
+        pyarrow = self.pyarrow
+
+        if self.schema is None:
+            return schema
+
+        types = {f.name: f.type for f in self.schema}
+        for f in schema:
+            types[f.name] = _merged_type(pyarrow, types.get(f.name, f.type), f.type)
+
+        return pyarrow.schema(list(types.items()))
+
+    def _conform(self, table):
+        pyarrow = self.pyarrow
+
+        return pyarrow.table(
+            [
+                (
+                    table.column(f.name).cast(f.type)
+                    if f.name in table.column_names
+                    else pyarrow.nulls(len(table), f.type)
+                )
+                for f in self.schema
+            ],
+            schema=self.schema,
+        )
+
+    def write(self, path, columns):
+        pyarrow = self.pyarrow
+
+        table = pyarrow.table(
+            {name: _arrow_array(pyarrow, values) for name, values in columns.items()}
+        )
+        self.schema = self._merge_schema(table.schema)
+
+        path = f"{path}.parquet"
+        pyarrow.parquet.write_table(self._conform(table), path)
+        self._written.append((path, self.schema))
+
+    def close(self):
+        for path, schema in self._written:
+            if not schema.equals(self.schema):
+                table = self.pyarrow.parquet.read_table(path)
+                self.pyarrow.parquet.write_table(self._conform(table), path)
+
+        self._written = [(path, self.schema) for path, _ in self._written]
+
+
+class NpzParts:
+    def __init__(self):
+        try:
+            import numpy
+        except ImportError:
+            FAIL("NumPy export requires numpy (run make build)")
+
+        self.numpy = numpy
+
+    def write(self, path, columns):
+        numpy = self.numpy
+
+        # Columns holding None are stored as object arrays, which need
+        # numpy.load(..., allow_pickle=True) to read back.
+        numpy.savez(
+            f"{path}.npz",
+            **{
+                name: numpy.array(values, dtype=object if None in values else None)
+                for name, values in columns.items()
+            },
+        )
+
+    def close(self):
+        pass
+
+
+WRITERS = {
+    "parquet": ParquetParts,
+    "npz": NpzParts,
+}
+
+
+class ColumnarWriter:
+    def __init__(self, output_dir, *, format="parquet", batch_rows=DEFAULT_BATCH_ROWS):
+        if format not in WRITERS:
+            FAIL(f"Unknown export format: {format} (expected one of {list(WRITERS)})")
+
+        self.output_dir = Path(output_dir)
+        self.parts = WRITERS[format]()
+        self.batch_rows = batch_rows
+
+        self.rows = 0
+        self.files = 0
+
+        self._columns = {}
+        self._batch_size = 0
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+            self.parts.close()
+
+    def append(self, row):
+        columns = self._columns
+        n = self._batch_size
+
+        for name, v in row.items():
+            values = columns.get(name)
+
+            if values is None:
+                values = columns[name] = [None] * n
+
+            values.append(v)
+
+        n += 1
+        for values in columns.values():
+            if len(values) < n:
+                values.append(None)
+
+        self._batch_size = n
+        self.rows += 1
+
+        if n >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._batch_size:
+            return
+
+        self.parts.write(self.output_dir / f"part-{self.files:05}", self._columns)
+
+        self.files += 1
+        self._columns = {}
+        self._batch_size = 0
+
+
+def export_updates(ledger, party, output_dir, *, template_ids=[], **writer_args):
+    offset_end = ledger.get_ledger_end()
+
+    with ColumnarWriter(output_dir, **writer_args) as writer:
+        for u in ledger._iter_update_messages(0, offset_end, party, template_ids):
+            if u.WhichOneof("update") != "transaction":
+                continue
+
+            tx = u.transaction
+            for evt in tx.events:
+                writer.append(event_row(tx, evt))
+
+    return offset_end, writer
+
+
+def export_contracts(ledger, party, output_dir, *, template_ids=[], **writer_args):
+    offset = ledger.get_ledger_end()
+
+    with ColumnarWriter(output_dir, **writer_args) as writer:
+        for c in ledger._iter_active_contract_messages(
+            party, template_ids, active_at_offset=offset
+        ):
+            writer.append(contract_row(c))
+
+    return offset, writer
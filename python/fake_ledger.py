@@ -0,0 +1,757 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# An in-process stand-in for the subset of the v2 Ledger API used by
+# LedgerConnection. It interprets just enough of the asset model (create,
+# Give and Archive) to exercise the client and keeps all state in memory.
+# It is intended for client performance work, not as a ledger model.
+#
+# Run standalone with:
+#
+#   PYTHONPATH=target/_gen .venv/bin/python3 -m python.fake_ledger \
+#       [--port 6865] [--latency SEC] [--payload-bytes N] \
+#       [--history N] [--parties alice,bob]
+#
+# which serves on the address in config.json, so ./run commands work
+# against it as they would against a sandbox.
+
+import argparse
+import grpc
+import hashlib
+import sys
+import threading
+import time
+
+from concurrent import futures
+
+import com.daml.ledger.api.v2.admin.party_management_service_pb2 as party_management_service_pb2
+import com.daml.ledger.api.v2.admin.party_management_service_pb2_grpc as party_management_service_pb2_grpc
+import com.daml.ledger.api.v2.command_completion_service_pb2 as command_completion_service_pb2
+import com.daml.ledger.api.v2.command_completion_service_pb2_grpc as command_completion_service_pb2_grpc
+import com.daml.ledger.api.v2.command_service_pb2 as command_service_pb2
+import com.daml.ledger.api.v2.command_service_pb2_grpc as command_service_pb2_grpc
+import com.daml.ledger.api.v2.command_submission_service_pb2 as command_submission_service_pb2
+import com.daml.ledger.api.v2.command_submission_service_pb2_grpc as command_submission_service_pb2_grpc
+import com.daml.ledger.api.v2.commands_pb2 as commands_pb2
+import com.daml.ledger.api.v2.completion_pb2 as completion_pb2
+import com.daml.ledger.api.v2.event_pb2 as event_pb2
+import com.daml.ledger.api.v2.package_service_pb2 as package_service_pb2
+import com.daml.ledger.api.v2.package_service_pb2_grpc as package_service_pb2_grpc
+import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
+import com.daml.ledger.api.v2.state_service_pb2_grpc as state_service_pb2_grpc
+import com.daml.ledger.api.v2.transaction_filter_pb2 as transaction_filter_pb2
+import com.daml.ledger.api.v2.transaction_pb2 as transaction_pb2
+import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+import com.daml.ledger.api.v2.update_service_pb2_grpc as update_service_pb2_grpc
+import com.daml.ledger.api.v2.value_pb2 as value_pb2
+import com.daml.ledger.api.v2.version_service_pb2 as version_service_pb2
+import com.daml.ledger.api.v2.version_service_pb2_grpc as version_service_pb2_grpc
+import google.rpc.status_pb2 as status_pb2
+
+from .value import party, record, value
+
+FAKE_VERSION = "3.3.0-fake"
+FAKE_PARTICIPANT = "1220" + "0" * 64
+FAKE_PACKAGE_ID = "f" * 64
+
+LEDGER_EFFECTS = transaction_filter_pb2.TRANSACTION_SHAPE_LEDGER_EFFECTS
+
+
+def _stakeholders(create_arguments):
+    return sorted(
+        {
+            f.value.party
+            for f in create_arguments.fields
+            if f.value.WhichOneof("sum") == "party"
+        }
+    )
+
+
+def _signatories(create_arguments):
+    return [
+        f.value.party
+        for f in create_arguments.fields
+        if f.label == "issuer" and f.value.WhichOneof("sum") == "party"
+    ]
+
+
+class LedgerRejection(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class FakeLedgerState:
+    def __init__(self, *, latency_sec=0.0, payload_bytes=0):
+        self.latency_sec = latency_sec
+        self.payload_bytes = payload_bytes
+
+        self.lock = threading.Condition()
+        self.offset = 0
+        self.parties = {}
+        self.contracts = {}
+        self.updates = []
+        self.ledger_effects = {}
+        self.completions = []
+        self.seen_command_ids = {}
+
+    def delay(self):
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+
+    def allocate_party(self, hint):
+        with self.lock:
+            party_id = f"{hint}::{FAKE_PARTICIPANT}"
+            self.parties.setdefault(party_id, hint)
+
+            return party_id
+
+    def _created_event(self, offset, node_id, template_id, create_arguments):
+        contract_id = hashlib.sha256(f"{offset}:{node_id}".encode()).hexdigest()
+        stakeholders = _stakeholders(create_arguments)
+
+        return event_pb2.CreatedEvent(
+            offset=offset,
+            node_id=node_id,
+            contract_id=f"00{contract_id}",
+            template_id=value_pb2.Identifier(
+                package_id=FAKE_PACKAGE_ID,
+                module_name=template_id.module_name,
+                entity_name=template_id.entity_name,
+            ),
+            create_arguments=create_arguments,
+            created_event_blob=b"\0" * self.payload_bytes,
+            witness_parties=stakeholders,
+            signatories=_signatories(create_arguments),
+            observers=[
+                p for p in stakeholders if p not in _signatories(create_arguments)
+            ],
+            package_name="asset-model",
+        )
+
+    def _archived_event(self, offset, node_id, created):
+        return event_pb2.ArchivedEvent(
+            offset=offset,
+            node_id=node_id,
+            contract_id=created.contract_id,
+            template_id=created.template_id,
+            witness_parties=created.witness_parties,
+            package_name=created.package_name,
+        )
+
+    # The acting parties of an exercise are its choice's controllers.
+    def _exercised_event(
+        self, offset, node_id, created, exercise, controllers, last_node_id
+    ):
+        return event_pb2.ExercisedEvent(
+            offset=offset,
+            node_id=node_id,
+            contract_id=created.contract_id,
+            template_id=created.template_id,
+            choice=exercise.choice,
+            choice_argument=exercise.choice_argument,
+            acting_parties=controllers,
+            consuming=True,
+            witness_parties=created.witness_parties,
+            last_descendant_node_id=last_node_id,
+            exercise_result=value_pb2.Value(unit={}),
+            package_name=created.package_name,
+        )
+
+    # Returns the events of the transaction in both shapes: ACS delta
+    # (created and archived) and ledger effects (created and exercised).
+    def _interpret(self, offset, act_as, commands):
+        events = []
+        effects = []
+        archived = set()
+
+        def fetch(contract_id):
+            created = self.contracts.get(contract_id)
+
+            if created is None or contract_id in archived:
+                raise LedgerRejection(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"CONTRACT_NOT_FOUND: Contract could not be found: {contract_id}",
+                )
+
+            return created
+
+        for command in commands:
+            kind = command.WhichOneof("command")
+
+            if kind == "create":
+                create_arguments = command.create.create_arguments
+                signatories = _signatories(create_arguments)
+
+                if not set(signatories) <= set(act_as):
+                    raise LedgerRejection(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        f"DAML_AUTHORIZATION_ERROR: requires authorizers {signatories}",
+                    )
+
+                created = self._created_event(
+                    offset,
+                    len(effects),
+                    command.create.template_id,
+                    create_arguments,
+                )
+                events.append(created)
+                effects.append(created)
+
+            elif kind == "exercise":
+                exercise = command.exercise
+                created = fetch(exercise.contract_id)
+                owner = [
+                    f.value.party
+                    for f in created.create_arguments.fields
+                    if f.label == "owner"
+                ]
+
+                if exercise.choice == "Archive":
+                    controllers = created.signatories
+                elif exercise.choice == "Give":
+                    controllers = owner
+                else:
+                    raise LedgerRejection(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        f"Unknown choice: {exercise.choice}",
+                    )
+
+                if not set(controllers) <= set(act_as):
+                    raise LedgerRejection(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        f"DAML_AUTHORIZATION_ERROR: requires authorizers {list(controllers)}",
+                    )
+
+                archived.add(created.contract_id)
+                node_id = len(effects)
+                events.append(self._archived_event(offset, node_id, created))
+                effects.append(
+                    self._exercised_event(
+                        offset,
+                        node_id,
+                        created,
+                        exercise,
+                        controllers,
+                        node_id + (exercise.choice == "Give"),
+                    )
+                )
+
+                if exercise.choice == "Give":
+                    new_owner = exercise.choice_argument.record.fields[0].value.party
+                    create_arguments = value_pb2.Record()
+                    create_arguments.CopyFrom(created.create_arguments)
+
+                    for f in create_arguments.fields:
+                        if f.label == "owner":
+                            f.value.party = new_owner
+
+                    given = self._created_event(
+                        offset,
+                        len(effects),
+                        created.template_id,
+                        create_arguments,
+                    )
+                    events.append(given)
+                    effects.append(given)
+
+            else:
+                raise LedgerRejection(
+                    grpc.StatusCode.UNIMPLEMENTED, f"Unsupported command: {kind}"
+                )
+
+        return events, effects
+
+    def submit(self, commands):
+        with self.lock:
+            offset = self.offset + 1
+
+            try:
+                if commands.command_id in self.seen_command_ids:
+                    raise LedgerRejection(
+                        grpc.StatusCode.ALREADY_EXISTS,
+                        f"DUPLICATE_COMMAND: {commands.command_id}",
+                    )
+
+                events, effects = self._interpret(
+                    offset, list(commands.act_as), commands.commands
+                )
+            except LedgerRejection as e:
+                # As on a participant, the rejection's completion takes the
+                # next offset, so completion streams can resume after it.
+                self.offset = offset
+                self._complete(commands, None, e)
+                raise
+
+            self.offset = offset
+
+            transaction = transaction_pb2.Transaction(
+                update_id=hashlib.sha256(f"update:{offset}".encode()).hexdigest(),
+                command_id=commands.command_id,
+                workflow_id=commands.workflow_id,
+                offset=offset,
+                events=[
+                    (
+                        event_pb2.Event(created=e)
+                        if isinstance(e, event_pb2.CreatedEvent)
+                        else event_pb2.Event(archived=e)
+                    )
+                    for e in events
+                ],
+            )
+
+            for e in events:
+                if isinstance(e, event_pb2.CreatedEvent):
+                    self.contracts[e.contract_id] = e
+                else:
+                    self.contracts.pop(e.contract_id, None)
+
+            effects_transaction = transaction_pb2.Transaction()
+            effects_transaction.CopyFrom(transaction)
+            del effects_transaction.events[:]
+            effects_transaction.events.extend(
+                (
+                    event_pb2.Event(created=e)
+                    if isinstance(e, event_pb2.CreatedEvent)
+                    else event_pb2.Event(exercised=e)
+                )
+                for e in effects
+            )
+
+            self.updates.append((list(commands.act_as), transaction))
+            self.ledger_effects[transaction.update_id] = effects_transaction
+            self.seen_command_ids[commands.command_id] = offset
+            self._complete(commands, transaction, None)
+            self.lock.notify_all()
+
+            return transaction
+
+    def _complete(self, commands, transaction, error):
+        if error is None:
+            status = status_pb2.Status(code=0)
+        else:
+            status = status_pb2.Status(code=error.code.value[0], message=error.message)
+
+        self.completions.append(
+            completion_pb2.Completion(
+                command_id=commands.command_id,
+                status=status,
+                update_id=transaction.update_id if transaction else "",
+                user_id=commands.user_id,
+                act_as=commands.act_as,
+                offset=self.offset,
+            )
+        )
+        self.lock.notify_all()
+
+    # The contracts active at offset, in creation order.
+    def active_contracts(self, offset):
+        with self.lock:
+            if offset == self.offset:
+                return list(self.contracts.values())
+
+            updates = [t for _, t in self.updates if t.offset <= offset]
+
+        contracts = {}
+
+        for transaction in updates:
+            for e in transaction.events:
+                if e.HasField("created"):
+                    contracts[e.created.contract_id] = e.created
+                else:
+                    contracts.pop(e.archived.contract_id, None)
+
+        return list(contracts.values())
+
+    def generate_history(self, parties, count, *, batch_size=1):
+        issuers = [self.allocate_party(p) for p in parties]
+        template_id = value_pb2.Identifier(
+            package_id="#asset-model", module_name="Main", entity_name="Asset"
+        )
+
+        for n in range(count):
+            issuer = issuers[n % len(issuers)]
+
+            self.submit(
+                commands_for(
+                    f"history-{self.offset}",
+                    [issuer],
+                    [
+                        _create(
+                            template_id,
+                            {
+                                "issuer": party(issuer),
+                                "owner": party(issuer),
+                                "name": f"asset-{n}-{i}",
+                            },
+                        )
+                        for i in range(batch_size)
+                    ],
+                )
+            )
+
+
+def _create(template_id, create_arguments):
+    return commands_pb2.Command(
+        create=commands_pb2.CreateCommand(
+            template_id=template_id, create_arguments=record(create_arguments)
+        )
+    )
+
+
+def commands_for(command_id, act_as, commands):
+    return commands_pb2.Commands(
+        user_id="fake", command_id=command_id, act_as=act_as, commands=commands
+    )
+
+
+# The templates each party of a TransactionFilter asks for, by party; an
+# empty set asks for all.
+def _template_filters(transaction_filter):
+    return {
+        p: {
+            (
+                c.template_filter.template_id.module_name,
+                c.template_filter.template_id.entity_name,
+            )
+            for c in filters.cumulative
+            if c.HasField("template_filter")
+        }
+        for p, filters in transaction_filter.filters_by_party.items()
+    }
+
+
+def _matches(event, template_filters):
+    template = (event.template_id.module_name, event.template_id.entity_name)
+
+    return any(
+        p in template_filters
+        and (not template_filters[p] or template in template_filters[p])
+        for p in event.witness_parties
+    )
+
+
+def _visible(transaction, template_filters):
+    return [
+        e
+        for e in transaction.events
+        if _matches(getattr(e, e.WhichOneof("event")), template_filters)
+    ]
+
+
+def _filter_transaction(act_as, transaction, template_filters):
+    events = _visible(transaction, template_filters)
+
+    if not events:
+        return None
+
+    filtered = transaction_pb2.Transaction()
+    filtered.CopyFrom(transaction)
+    del filtered.events[:]
+    filtered.events.extend(events)
+
+    if not set(act_as) & template_filters.keys():
+        filtered.command_id = ""
+
+    return filtered
+
+
+def _requested_transaction(state, act_as, transaction, transaction_format, parties):
+    if transaction_format.transaction_shape == LEDGER_EFFECTS:
+        transaction = state.ledger_effects[transaction.update_id]
+        parties = transaction_format.event_format.filters_by_party.keys()
+
+    return _filter_transaction(act_as, transaction, {p: set() for p in parties})
+
+
+def _abort(context, e):
+    context.abort(e.code, e.message)
+
+
+class VersionService(version_service_pb2_grpc.VersionServiceServicer):
+    def __init__(self, state):
+        self.state = state
+
+    def GetLedgerApiVersion(self, request, context):
+        return version_service_pb2.GetLedgerApiVersionResponse(version=FAKE_VERSION)
+
+
+class StateService(state_service_pb2_grpc.StateServiceServicer):
+    def __init__(self, state):
+        self.state = state
+
+    def GetLedgerEnd(self, request, context):
+        self.state.delay()
+
+        return state_service_pb2.GetLedgerEndResponse(offset=self.state.offset)
+
+    # Answers from history as of active_at_offset, which a participant
+    # requires to be at most the ledger end. Offset 0 is before the first
+    # transaction, so nothing is active yet.
+    def GetActiveContracts(self, request, context):
+        self.state.delay()
+
+        if request.active_at_offset > self.state.offset:
+            context.abort(
+                grpc.StatusCode.OUT_OF_RANGE,
+                f"OFFSET_AFTER_LEDGER_END: {request.active_at_offset}",
+            )
+
+        template_filters = _template_filters(request.filter)
+
+        for c in self.state.active_contracts(request.active_at_offset):
+            if not _matches(c, template_filters):
+                continue
+
+            yield state_service_pb2.GetActiveContractsResponse(
+                active_contract=state_service_pb2.ActiveContract(created_event=c)
+            )
+
+
+class UpdateService(update_service_pb2_grpc.UpdateServiceServicer):
+    def __init__(self, state):
+        self.state = state
+
+    def GetUpdates(self, request, context):
+        self.state.delay()
+
+        template_filters = _template_filters(request.filter)
+        ofs = request.begin_exclusive
+
+        while context.is_active():
+            with self.state.lock:
+                if request.HasField("end_inclusive"):
+                    end = request.end_inclusive
+                else:
+                    while self.state.offset <= ofs and context.is_active():
+                        self.state.lock.wait(0.1)
+
+                    end = self.state.offset
+
+                pending = [
+                    (act_as, t)
+                    for (act_as, t) in self.state.updates
+                    if ofs < t.offset <= end
+                ]
+
+            for act_as, transaction in pending:
+                filtered = _filter_transaction(act_as, transaction, template_filters)
+
+                if filtered is not None:
+                    yield update_service_pb2.GetUpdatesResponse(transaction=filtered)
+
+            if request.HasField("end_inclusive"):
+                return
+
+            # Offsets taken by rejections have no update.
+            ofs = end
+
+    def GetTransactionById(self, request, context):
+        self.state.delay()
+
+        with self.state.lock:
+            updates = list(self.state.updates)
+
+        for act_as, transaction in updates:
+            if transaction.update_id == request.update_id:
+                filtered = _requested_transaction(
+                    self.state,
+                    act_as,
+                    transaction,
+                    request.transaction_format,
+                    request.requesting_parties,
+                )
+
+                if filtered is not None:
+                    return update_service_pb2.GetTransactionResponse(
+                        transaction=filtered
+                    )
+
+        context.abort(grpc.StatusCode.NOT_FOUND, "TRANSACTION_NOT_FOUND")
+
+
+class CommandService(command_service_pb2_grpc.CommandServiceServicer):
+    def __init__(self, state):
+        self.state = state
+
+    def SubmitAndWaitForTransaction(self, request, context):
+        self.state.delay()
+
+        try:
+            transaction = self.state.submit(request.commands)
+        except LedgerRejection as e:
+            _abort(context, e)
+
+        return command_service_pb2.SubmitAndWaitForTransactionResponse(
+            transaction=_requested_transaction(
+                self.state,
+                request.commands.act_as,
+                transaction,
+                request.transaction_format,
+                request.commands.act_as,
+            )
+            or transaction_pb2.Transaction(
+                update_id=transaction.update_id,
+                command_id=transaction.command_id,
+                offset=transaction.offset,
+            )
+        )
+
+
+class CommandSubmissionService(
+    command_submission_service_pb2_grpc.CommandSubmissionServiceServicer
+):
+    def __init__(self, state):
+        self.state = state
+
+    def Submit(self, request, context):
+        self.state.delay()
+
+        try:
+            self.state.submit(request.commands)
+        except LedgerRejection:
+            # Rejections after submission are reported on the completion
+            # stream, as with a real participant.
+            pass
+
+        return command_submission_service_pb2.SubmitResponse()
+
+
+class CommandCompletionService(
+    command_completion_service_pb2_grpc.CommandCompletionServiceServicer
+):
+    def __init__(self, state):
+        self.state = state
+
+    def CompletionStream(self, request, context):
+        parties = set(request.parties)
+        ofs = request.begin_exclusive
+        index = 0
+
+        while context.is_active():
+            with self.state.lock:
+                while index >= len(self.state.completions) and context.is_active():
+                    self.state.lock.wait(0.1)
+
+                pending = self.state.completions[index:]
+                index = len(self.state.completions)
+
+            for c in pending:
+                if c.offset > ofs:
+                    if set(c.act_as) & parties:
+                        yield command_completion_service_pb2.CompletionStreamResponse(
+                            completion=c
+                        )
+
+
+class PartyManagementService(
+    party_management_service_pb2_grpc.PartyManagementServiceServicer
+):
+    def __init__(self, state):
+        self.state = state
+
+    def ListKnownParties(self, request, context):
+        self.state.delay()
+
+        with self.state.lock:
+            parties = sorted(self.state.parties.keys())
+
+        start = int(request.page_token or "0")
+        end = start + (request.page_size or len(parties))
+
+        return party_management_service_pb2.ListKnownPartiesResponse(
+            party_details=[
+                party_management_service_pb2.PartyDetails(party=p, is_local=True)
+                for p in parties[start:end]
+            ],
+            next_page_token=str(end) if end < len(parties) else "",
+        )
+
+    def AllocateParty(self, request, context):
+        self.state.delay()
+
+        party_id = self.state.allocate_party(request.party_id_hint)
+
+        return party_management_service_pb2.AllocatePartyResponse(
+            party_details=party_management_service_pb2.PartyDetails(
+                party=party_id, is_local=True
+            )
+        )
+
+
+class PackageService(package_service_pb2_grpc.PackageServiceServicer):
+    def __init__(self, state):
+        self.state = state
+
+    def ListPackages(self, request, context):
+        return package_service_pb2.ListPackagesResponse(package_ids=[FAKE_PACKAGE_ID])
+
+
+def start_fake_ledger(addr="localhost:0", *, state=None, max_workers=32):
+    state = state or FakeLedgerState()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+
+    version_service_pb2_grpc.add_VersionServiceServicer_to_server(
+        VersionService(state), server
+    )
+    state_service_pb2_grpc.add_StateServiceServicer_to_server(
+        StateService(state), server
+    )
+    update_service_pb2_grpc.add_UpdateServiceServicer_to_server(
+        UpdateService(state), server
+    )
+    command_service_pb2_grpc.add_CommandServiceServicer_to_server(
+        CommandService(state), server
+    )
+    command_submission_service_pb2_grpc.add_CommandSubmissionServiceServicer_to_server(
+        CommandSubmissionService(state), server
+    )
+    command_completion_service_pb2_grpc.add_CommandCompletionServiceServicer_to_server(
+        CommandCompletionService(state), server
+    )
+    party_management_service_pb2_grpc.add_PartyManagementServiceServicer_to_server(
+        PartyManagementService(state), server
+    )
+    package_service_pb2_grpc.add_PackageServiceServicer_to_server(
+        PackageService(state), server
+    )
+
+    port = server.add_insecure_port(addr)
+    server.start()
+
+    return server, state, f"localhost:{port}"
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog="fake_ledger")
+    parser.add_argument("--port", type=int, default=6865)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--history", type=int, default=0)
+    parser.add_argument("--parties", default="alice,bob")
+    opts = parser.parse_args(argv)
+
+    state = FakeLedgerState(latency_sec=opts.latency, payload_bytes=opts.payload_bytes)
+
+    parties = opts.parties.split(",")
+    for p in parties:
+        state.allocate_party(p)
+
+    state.generate_history(parties, opts.history)
+
+    server, _, addr = start_fake_ledger(f"localhost:{opts.port}", state=state)
+
+    print(f"Fake ledger listening on {addr} (offset {state.offset})")
+
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(0)
+
+
+if __name__ == "__main__":
+    main()
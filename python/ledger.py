@@ -4,30 +4,59 @@
 # Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
 # SPDX-License-Identifier: BSD0
 
+import itertools
+import threading
 import time
 import grpc
 import pprint
 import uuid
 
-import com.daml.ledger.api.v2.admin.party_management_service_pb2 as party_management_service_pb2
-import com.daml.ledger.api.v2.admin.party_management_service_pb2_grpc as party_management_service_pb2_grpc
-import com.daml.ledger.api.v2.command_service_pb2 as command_service_pb2
-import com.daml.ledger.api.v2.command_service_pb2_grpc as command_service_pb2_grpc
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from google.protobuf.duration_pb2 import Duration
+
 import com.daml.ledger.api.v2.commands_pb2 as commands_pb2
-import com.daml.ledger.api.v2.package_service_pb2 as package_service_pb2
-import com.daml.ledger.api.v2.package_service_pb2_grpc as package_service_pb2_grpc
-import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
-import com.daml.ledger.api.v2.state_service_pb2_grpc as state_service_pb2_grpc
-import com.daml.ledger.api.v2.transaction_filter_pb2 as transaction_filter_pb2
 import com.daml.ledger.api.v2.value_pb2 as value_pb2
-import com.daml.ledger.api.v2.version_service_pb2 as version_service_pb2
-import com.daml.ledger.api.v2.version_service_pb2_grpc as version_service_pb2_grpc
-import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
-import com.daml.ledger.api.v2.update_service_pb2_grpc as update_service_pb2_grpc
 
+from .codec import CodecRecord
+from .config import ChannelConfig
+from .retry import RetryPolicy
+from .util import FAIL, LazyModule
+from .value import assign_value, record, value, decode, decode_lazy
 
-from .util import FAIL
-from .value import record, value, decode
+# The message modules above are needed to build any command; the request
+# and service modules below are only imported once a command calls the
+# service.
+command_service_pb2 = LazyModule("com.daml.ledger.api.v2.command_service_pb2")
+state_service_pb2 = LazyModule("com.daml.ledger.api.v2.state_service_pb2")
+transaction_filter_pb2 = LazyModule("com.daml.ledger.api.v2.transaction_filter_pb2")
+update_service_pb2 = LazyModule("com.daml.ledger.api.v2.update_service_pb2")
+party_management_service_pb2 = LazyModule(
+    "com.daml.ledger.api.v2.admin.party_management_service_pb2"
+)
+party_management_service_pb2_grpc = LazyModule(
+    "com.daml.ledger.api.v2.admin.party_management_service_pb2_grpc"
+)
+command_completion_service_pb2 = LazyModule(
+    "com.daml.ledger.api.v2.command_completion_service_pb2"
+)
+command_completion_service_pb2_grpc = LazyModule(
+    "com.daml.ledger.api.v2.command_completion_service_pb2_grpc"
+)
+command_service_pb2_grpc = LazyModule("com.daml.ledger.api.v2.command_service_pb2_grpc")
+command_submission_service_pb2 = LazyModule(
+    "com.daml.ledger.api.v2.command_submission_service_pb2"
+)
+command_submission_service_pb2_grpc = LazyModule(
+    "com.daml.ledger.api.v2.command_submission_service_pb2_grpc"
+)
+package_service_pb2 = LazyModule("com.daml.ledger.api.v2.package_service_pb2")
+package_service_pb2_grpc = LazyModule("com.daml.ledger.api.v2.package_service_pb2_grpc")
+state_service_pb2_grpc = LazyModule("com.daml.ledger.api.v2.state_service_pb2_grpc")
+version_service_pb2 = LazyModule("com.daml.ledger.api.v2.version_service_pb2")
+version_service_pb2_grpc = LazyModule("com.daml.ledger.api.v2.version_service_pb2_grpc")
+update_service_pb2_grpc = LazyModule("com.daml.ledger.api.v2.update_service_pb2_grpc")
+pipeline = LazyModule(f"{__package__}.pipeline")
 
 
 def _ensure_list(p):
@@ -37,11 +66,439 @@ def _ensure_list(p):
         return []
 
 
+COMPRESSION = {
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+    "none": grpc.Compression.NoCompression,
+}
+
+
+def channel_options(config):
+    options = {
+        "grpc.max_receive_message_length": config.maxReceiveMessageLength,
+        "grpc.max_send_message_length": config.maxSendMessageLength,
+        "grpc.keepalive_time_ms": config.keepaliveTimeMs,
+        "grpc.keepalive_timeout_ms": config.keepaliveTimeoutMs,
+        "grpc.keepalive_permit_without_calls": int(config.keepalivePermitWithoutCalls),
+        "grpc.http2.lookahead_bytes": config.http2LookaheadBytes,
+        "grpc.http2.bdp_probe": int(config.http2BdpProbe),
+        "grpc.http2.max_frame_size": config.http2MaxFrameSize,
+    }
+
+    if config.poolSize > 1:
+        # Without this, channels with identical arguments share one
+        # subchannel and therefore one HTTP/2 connection.
+        options["grpc.use_local_subchannel_pool"] = 1
+
+    return [(k, v) for k, v in options.items() if v is not None]
+
+
+def call_compression(config, call_type):
+    algorithm = config.compression.get(call_type)
+
+    if algorithm is None:
+        return None
+    elif algorithm in COMPRESSION:
+        return COMPRESSION[algorithm]
+    else:
+        FAIL(f"Unknown compression for {call_type} calls: {algorithm}")
+
+
+def open_channels(channel_fn, addr, config):
+    return [
+        channel_fn(addr, options=channel_options(config))
+        for _ in range(max(config.poolSize, 1))
+    ]
+
+
+# Spreads calls round-robin over one stub per pooled channel.
+class RoundRobinStub:
+    def __init__(self, stubs):
+        self._stubs = stubs
+        self._next = itertools.count()
+
+    def __getattr__(self, name):
+        return getattr(self._stubs[next(self._next) % len(self._stubs)], name)
+
+
+def make_stub(stub_class, channels):
+    if len(channels) == 1:
+        return stub_class(channels[0])
+    else:
+        return RoundRobinStub([stub_class(c) for c in channels])
+
+
+def transaction_filter(party, template_ids=[]):
+    def template_filter(tid):
+        return transaction_filter_pb2.CumulativeFilter(
+            template_filter=transaction_filter_pb2.TemplateFilter(template_id=tid)
+        )
+
+    return transaction_filter_pb2.TransactionFilter(
+        filters_by_party={
+            party: transaction_filter_pb2.Filters(
+                cumulative=[template_filter(tid) for tid in _ensure_list(template_ids)]
+            )
+        }
+    )
+
+
+def transaction_format(parties, transaction_shape):
+    return transaction_filter_pb2.TransactionFormat(
+        event_format=transaction_filter_pb2.EventFormat(
+            filters_by_party={
+                party: transaction_filter_pb2.Filters()
+                for party in _ensure_list(parties)
+            }
+        ),
+        transaction_shape=transaction_shape,
+    )
+
+
+def build_commands(
+    user_id,
+    command_id,
+    act_as,
+    commands,
+    *,
+    deduplication_offset=None,
+    deduplication_duration_sec=None,
+    disclosed_contracts=[],
+):
+    return commands_pb2.Commands(
+        user_id=user_id,
+        command_id=command_id,
+        act_as=_ensure_list(act_as),
+        commands=_ensure_list(commands),
+        deduplication_offset=deduplication_offset,
+        deduplication_duration=(
+            None
+            if deduplication_duration_sec is None
+            else Duration(seconds=deduplication_duration_sec)
+        ),
+        disclosed_contracts=disclosed_contracts,
+    )
+
+
+def party_list(resp):
+    return [{"party": p.party, "is_local": p.is_local} for p in resp.party_details]
+
+
+def find_party(parties, party_name):
+    for p in parties:
+        if party_name == p["party"].split(":")[0] or party_name == p["party"]:
+            return p["party"]
+
+    return None
+
+
+DEFAULT_PARTY_CACHE_TTL_SEC = 60
+
+# Deduplication period of retried submissions. It has to outlast the
+# retries, and stay within the participant's maximum deduplication
+# duration (a week by default).
+DEDUPLICATION_DURATION_SEC = 600
+PARTY_PAGE_SIZE = 1000
+
+
+# Cached view of ListKnownParties, indexed by full party id and by the
+# hint prefix of local parties. Reloaded when older than ttl_sec, or
+# after invalidate() (called on party allocation).
+class PartyDirectory:
+    def __init__(self, ledger, *, ttl_sec=DEFAULT_PARTY_CACHE_TTL_SEC):
+        self.ledger = ledger
+        self.ttl_sec = ttl_sec
+
+        self._lock = threading.Lock()
+        self._parties = []
+        self._by_id = {}
+        self._by_hint = {}
+        self._loaded_at = None
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _is_stale(self):
+        return (
+            self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_sec
+        )
+
+    def _list_known_parties(self):
+        page_token = ""
+
+        while True:
+            req = party_management_service_pb2.ListKnownPartiesRequest(
+                page_token=page_token, page_size=PARTY_PAGE_SIZE
+            )
+            resp = self.ledger._call(
+                "query", self.ledger._party_management_service.ListKnownParties, req
+            )
+
+            yield from party_list(resp)
+
+            page_token = resp.next_page_token
+            if not page_token:
+                return
+
+    def refresh(self):
+        parties = list(self._list_known_parties())
+
+        by_id = {}
+        by_hint = {}
+        for p in parties:
+            by_id[p["party"]] = p
+
+            if p["is_local"]:
+                by_hint.setdefault(p["party"].split(":")[0], p)
+
+        with self._lock:
+            self._parties = parties
+            self._by_id = by_id
+            self._by_hint = by_hint
+            self._loaded_at = time.monotonic()
+
+        return parties
+
+    def parties(self):
+        if self._is_stale():
+            return self.refresh()
+
+        return self._parties
+
+    def _lookup_local(self, party_name):
+        p = self._by_id.get(party_name)
+
+        if p is not None and p["is_local"]:
+            return p["party"]
+
+        p = self._by_hint.get(party_name)
+
+        return p["party"] if p is not None else None
+
+    def lookup_local(self, party_name):
+        stale = self._is_stale()
+        if stale:
+            self.refresh()
+
+        party_id = self._lookup_local(party_name)
+
+        # A miss against a fresh cache may be a party allocated elsewhere
+        # since the last load, so reload once before giving up.
+        if party_id is None and not stale:
+            self.refresh()
+            party_id = self._lookup_local(party_name)
+
+        return party_id
+
+
+class CommandRejected(Exception):
+    def __init__(self, completion):
+        super().__init__(
+            f"Command {completion.command_id} rejected: {completion.status.message}"
+        )
+        self.completion = completion
+        self.code = completion.status.code
+
+
+def _chain_future(future, fn, *, executor=None):
+    result = Future()
+
+    def apply(v):
+        try:
+            result.set_result(fn(v))
+        except Exception as e:
+            result.set_exception(e)
+
+    def on_done(f):
+        if f.exception() is not None:
+            result.set_exception(f.exception())
+        elif executor is not None:
+            executor.submit(apply, f.result())
+        else:
+            apply(f.result())
+
+    future.add_done_callback(on_done)
+
+    return result
+
+
+# Correlates commands sent via CommandSubmissionService with their results
+# on a single long-lived CompletionStream, keyed by command_id.
+class CompletionTracker:
+    def __init__(self, ledger, parties):
+        self.ledger = ledger
+        self.parties = parties
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stream = None
+        self._thread = None
+        self.begin_exclusive = None
+        self.closed = False
+
+    def start(self):
+        self.begin_exclusive = self.ledger.get_ledger_end()
+
+        req = command_completion_service_pb2.CompletionStreamRequest(
+            user_id=self.ledger.user_id,
+            parties=self.parties,
+            begin_exclusive=self.begin_exclusive,
+        )
+
+        self._stream = self.ledger._command_completion_service.CompletionStream(
+            req, compression=self.ledger._compression("stream")
+        )
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.cancel()
+            self._thread.join()
+
+    def track(self, command_id):
+        future = Future()
+
+        with self._lock:
+            if self.closed:
+                raise RuntimeError(f"Completion stream closed: {self.parties}")
+
+            self._pending[command_id] = future
+
+        return future
+
+    def untrack(self, command_id):
+        with self._lock:
+            return self._pending.pop(command_id, None)
+
+    def _run(self):
+        error = RuntimeError("Completion stream closed")
+
+        try:
+            for resp in self._stream:
+                if resp.HasField("completion"):
+                    self._complete(resp.completion)
+        except grpc.RpcError as e:
+            error = e
+
+        self._fail_all(error)
+
+    def _complete(self, completion):
+        future = self.untrack(completion.command_id)
+
+        if future is None:
+            return
+        elif completion.status.code == 0:
+            future.set_result(completion)
+        else:
+            future.set_exception(CommandRejected(completion))
+
+    def _fail_all(self, e):
+        with self._lock:
+            self.closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        for future in pending:
+            future.set_exception(e)
+
+
+# Decodes a GetActiveContracts stream as it arrives, yielding one
+# contract at a time, or lists of up to batch_size contracts. offset is
+# the ledger offset at which the snapshot was taken.
+class ActiveContractStream:
+    def __init__(self, active_contracts, *, offset, batch_size=None, decode=decode):
+        self.offset = offset
+        self.batch_size = batch_size
+        self.decode = decode
+
+        self._active_contracts = active_contracts
+
+    def _contracts(self):
+        for c in self._active_contracts:
+            yield self.decode(c)
+
+    def __iter__(self):
+        if not self.batch_size:
+            yield from self._contracts()
+            return
+
+        batch = []
+        for c in self._contracts():
+            batch.append(c)
+
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+# Stub attributes of LedgerConnection, by module and stub class name.
+SERVICE_STUBS = {
+    "_version_service": (version_service_pb2_grpc, "VersionServiceStub"),
+    "_package_service": (package_service_pb2_grpc, "PackageServiceStub"),
+    "_party_management_service": (
+        party_management_service_pb2_grpc,
+        "PartyManagementServiceStub",
+    ),
+    "_state_service": (state_service_pb2_grpc, "StateServiceStub"),
+    "_command_service": (command_service_pb2_grpc, "CommandServiceStub"),
+    "_update_service": (update_service_pb2_grpc, "UpdateServiceStub"),
+    "_raw_update_service": (pipeline, "RawUpdateServiceStub"),
+    "_command_submission_service": (
+        command_submission_service_pb2_grpc,
+        "CommandSubmissionServiceStub",
+    ),
+    "_command_completion_service": (
+        command_completion_service_pb2_grpc,
+        "CommandCompletionServiceStub",
+    ),
+}
+
+
 class LedgerConnection:
-    def __init__(self, addr, *, user_id="default"):
+    def __init__(
+        self,
+        addr,
+        *,
+        user_id="default",
+        party_cache_ttl_sec=DEFAULT_PARTY_CACHE_TTL_SEC,
+        channel_config=None,
+        retry_policy=None,
+        lazy_decode=False,
+        decoder=None,
+        decode_workers=0,
+    ):
         self.addr = addr
         self.user_id = user_id
+        self.channel_config = channel_config or ChannelConfig()
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+
+        # With lazy_decode, streamed events and contracts are views that
+        # decode each field on first access. decoder replaces the decoding
+        # of streamed messages outright, e.g. with CompactDecoder().decode.
+        self._decode = decoder or (decode_lazy if lazy_decode else decode)
+
+        # With decode_workers, update histories are decoded by a pool of
+        # that many processes (see pipeline.py), which decode with decode().
+        if decode_workers and (lazy_decode or decoder):
+            FAIL("decode_workers cannot be combined with lazy_decode or decoder")
+
+        self.decode_workers = decode_workers
+        self._decode_pool = None
         self.channel = None
+        self.channels = []
+
+        self.party_directory = PartyDirectory(self, ttl_sec=party_cache_ttl_sec)
+
+        self._completion_trackers = {}
+        self._trackers_lock = threading.Lock()
+        self._fetch_executor = None
+        self._offset_seen = None
 
     def __enter__(self):
         self.open()
@@ -55,103 +512,322 @@ class LedgerConnection:
         if self.channel is not None:
             raise Exception(f"Cannot open a channel twice: {self}")
 
-        channel = grpc.insecure_channel(self.addr)
-
-        self.channel = channel
+        channels = open_channels(grpc.insecure_channel, self.addr, self.channel_config)
 
-        self._version_service = version_service_pb2_grpc.VersionServiceStub(channel)
-        self._package_service = package_service_pb2_grpc.PackageServiceStub(channel)
-        self._party_management_service = (
-            party_management_service_pb2_grpc.PartyManagementServiceStub(channel)
-        )
-        self._state_service = state_service_pb2_grpc.StateServiceStub(channel)
-        self._command_service = command_service_pb2_grpc.CommandServiceStub(channel)
-        self._update_service = update_service_pb2_grpc.UpdateServiceStub(channel)
+        self.channel = channels[0]
+        self.channels = channels
 
         return self
 
+    # Service stubs are made on first use, so a command only imports the
+    # generated modules of the services it calls.
+    def __getattr__(self, name):
+        service = SERVICE_STUBS.get(name)
+
+        if service is None or not self.__dict__.get("channels"):
+            raise AttributeError(name)
+
+        module, stub_class = service
+        stub = make_stub(getattr(module, stub_class), self.channels)
+        setattr(self, name, stub)
+
+        return stub
+
     def close(self):
         if self.channel is None:
             raise Exception(f"Channel cannot be closed (not open): {self}")
 
-        self.channel.close()
+        with self._trackers_lock:
+            trackers = self._completion_trackers
+            self._completion_trackers = {}
+
+        for tracker in trackers.values():
+            tracker.close()
+
+        if self._fetch_executor is not None:
+            self._fetch_executor.shutdown()
+            self._fetch_executor = None
+
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown()
+            self._decode_pool = None
+
+        for channel in self.channels:
+            channel.close()
+
+        for name in SERVICE_STUBS:
+            self.__dict__.pop(name, None)
+
         self.channel = None
+        self.channels = []
 
     def _gen_command_id(self):
         return uuid.uuid4().hex
 
+    def _compression(self, call_type):
+        return call_compression(self.channel_config, call_type)
+
+    def _call(self, call_type, method, req):
+        compression = self._compression(call_type)
+
+        return self.retry_policy.call(
+            call_type,
+            lambda timeout: method(req, timeout=timeout, compression=compression),
+        )
+
+    def _commands(
+        self,
+        act_as,
+        commands,
+        *,
+        command_id=None,
+        deduplication_offset=None,
+        deduplication_duration_sec=None,
+        disclosed_contracts=[],
+    ):
+        return build_commands(
+            self.user_id,
+            command_id or self._gen_command_id(),
+            act_as,
+            commands,
+            deduplication_offset=deduplication_offset,
+            deduplication_duration_sec=deduplication_duration_sec,
+            disclosed_contracts=disclosed_contracts,
+        )
+
     def get_ledger_version(self):
         req = version_service_pb2.GetLedgerApiVersionRequest()
 
-        return self._version_service.GetLedgerApiVersion(req).version
+        return self._call(
+            "query", self._version_service.GetLedgerApiVersion, req
+        ).version
 
     def get_ledger_end(self):
         req = state_service_pb2.GetLedgerEndRequest()
+        offset = self._call("query", self._state_service.GetLedgerEnd, req).offset
 
-        return self._state_service.GetLedgerEnd(req).offset
+        self._see_offset(offset)
+
+        return offset
+
+    # The highest offset this connection has seen, from the ledger end and
+    # the results of its own submissions, is at or before the offset of
+    # anything submitted later. Lost updates only make it lower, which is
+    # still a safe place to start searching from.
+    def _see_offset(self, offset):
+        if self._offset_seen is None or offset > self._offset_seen:
+            self._offset_seen = offset
+
+    def _recent_offset(self):
+        if self._offset_seen is None:
+            return self.get_ledger_end()
+
+        return self._offset_seen
 
     def get_ledger_packages(self):
         req = package_service_pb2.ListPackagesRequest()
 
-        return self._package_service.ListPackages(req)
+        return self._call("query", self._package_service.ListPackages, req)
 
     def get_ledger_parties(self):
-        req = party_management_service_pb2.ListKnownPartiesRequest()
-
-        return [
-            {"party": p.party, "is_local": p.is_local}
-            for p in self._party_management_service.ListKnownParties(req).party_details
-        ]
+        return self.party_directory.refresh()
 
     def get_ledger_local_parties(self):
         return [p for p in self.get_ledger_parties() if p["is_local"]]
 
     def lookup_local_party_id(self, party_name):
-        for p in self.get_ledger_local_parties():
-            if party_name == p["party"].split(":")[0] or party_name == p["party"]:
-                return p["party"]
-
-        return None
+        return self.party_directory.lookup_local(party_name)
 
     def allocate_party(self, party_id_hint):
         req = party_management_service_pb2.AllocatePartyRequest(
             party_id_hint=party_id_hint
         )
 
-        return self._party_management_service.AllocateParty(req)
+        resp = self._call("query", self._party_management_service.AllocateParty, req)
+        self.party_directory.invalidate()
+
+        return resp
 
     def _get_transaction_filter(self, party, template_ids=[]):
-        def template_filter(tid):
-            return transaction_filter_pb2.CumulativeFilter(
-                template_filter=transaction_filter_pb2.TemplateFilter(
-                    template_id=tid
-                )
-            )
+        return transaction_filter(party, template_ids)
+
+    def _iter_active_contract_messages(self, party, template_ids, *, active_at_offset):
+        req = state_service_pb2.GetActiveContractsRequest(
+            filter=self._get_transaction_filter(party, template_ids),
+            verbose=True,
+            active_at_offset=active_at_offset,
+        )
 
+        for c in self._state_service.GetActiveContracts(
+            req, compression=self._compression("stream")
+        ):
+            if c.HasField("active_contract"):
+                yield c.active_contract
 
-        return transaction_filter_pb2.TransactionFilter(
-            filters_by_party={
-                party: transaction_filter_pb2.Filters(
-                    cumulative=[
-                        template_filter(tid) for tid in _ensure_list(template_ids)
-                    ]
+    def iter_active_contracts(
+        self, party, template_ids=[], *, active_at_offset=None, batch_size=None
+    ):
+        if active_at_offset is None:
+            active_at_offset = self.get_ledger_end()
+
+        return ActiveContractStream(
+            self._iter_active_contract_messages(
+                party, template_ids, active_at_offset=active_at_offset
+            ),
+            offset=active_at_offset,
+            batch_size=batch_size,
+            decode=self._decode,
+        )
+
+    def get_active_contracts(self, party, template_ids=[], *, active_at_offset=None):
+        if active_at_offset is None:
+            active_at_offset = self.get_ledger_end()
+
+        return self.retry_policy.call(
+            "stream",
+            lambda _: list(
+                self.iter_active_contracts(
+                    party, template_ids, active_at_offset=active_at_offset
                 )
-            }
+            ),
         )
 
-    def get_active_contracts(self, party, template_ids=[]):
-        req = state_service_pb2.GetActiveContractsRequest(
-            filter=self._get_transaction_filter(party, template_ids), verbose=True
+    def submit(
+        self,
+        act_as,
+        commands,
+        *,
+        command_id=None,
+        deduplication_offset=None,
+        disclosed_contracts=[],
+        transaction_shape=None,
+    ):
+        # Retries resend the same command_id within a deduplication period,
+        # so a command that was applied but whose response was lost is
+        # rejected as a duplicate rather than applied twice. A duration
+        # needs no GetLedgerEnd call per command; the duplicate is looked
+        # for after the latest offset seen before the first attempt.
+        deduplication_duration_sec = None
+        search_from = deduplication_offset
+
+        if deduplication_offset is None and self.retry_policy.retries_enabled:
+            deduplication_duration_sec = DEDUPLICATION_DURATION_SEC
+            search_from = self._recent_offset()
+
+        commands = self._commands(
+            act_as,
+            commands,
+            command_id=command_id,
+            deduplication_offset=deduplication_offset,
+            deduplication_duration_sec=deduplication_duration_sec,
+            disclosed_contracts=disclosed_contracts,
         )
 
-        return [
-            decode(c.active_contract)
-            for c in self._state_service.GetActiveContracts(req)
-            if not c.offset
-        ]
+        if transaction_shape is None:
+            req = command_service_pb2.SubmitAndWaitRequest(commands=commands)
+        else:
+            req = command_service_pb2.SubmitAndWaitForTransactionRequest(
+                commands=commands,
+                transaction_format=transaction_format(
+                    list(commands.act_as), transaction_shape
+                ),
+            )
 
+        compression = self._compression("submit")
+        attempt_num = 0
 
-    def submit(
+        def attempt(timeout):
+            nonlocal attempt_num
+            attempt_num += 1
+
+            try:
+                return self._command_service.SubmitAndWaitForTransaction(
+                    req, timeout=timeout, compression=compression
+                )
+            except grpc.RpcError as e:
+                if attempt_num > 1 and e.code() == grpc.StatusCode.ALREADY_EXISTS:
+                    return None
+                raise
+
+        resp = self.retry_policy.call("submit", attempt)
+
+        if resp is None:
+            return self._find_transaction_by_command_id(
+                list(commands.act_as),
+                commands.command_id,
+                search_from,
+                transaction_shape=transaction_shape,
+            )
+
+        self._see_offset(resp.transaction.offset)
+
+        return decode(resp)
+
+    def _find_transaction_by_command_id(
+        self, act_as, command_id, begin_exclusive, *, transaction_shape=None
+    ):
+        # Matched on the raw messages and decoded with decode(), as a
+        # transaction submitted without a retry is, whatever decoder
+        # streams use.
+        for u in self._iter_update_messages(
+            begin_exclusive, self.get_ledger_end(), act_as[0]
+        ):
+            if u.WhichOneof("update") != "transaction":
+                continue
+
+            tx = u.transaction
+
+            if tx.command_id != command_id:
+                continue
+            elif transaction_shape is None:
+                return decode(tx)
+            else:
+                return self.get_transaction_by_id(
+                    tx.update_id, act_as, transaction_shape=transaction_shape
+                )
+
+        FAIL(f"Command reported as duplicate but not found: {command_id}")
+
+    # Held while starting a tracker, so concurrent first submissions for the
+    # same parties share one completion stream rather than leaking one.
+    def _completion_tracker(self, act_as):
+        parties = tuple(sorted(act_as))
+
+        with self._trackers_lock:
+            tracker = self._completion_trackers.get(parties)
+
+            if tracker is None or tracker.closed:
+                tracker = CompletionTracker(self, list(parties)).start()
+                self._completion_trackers[parties] = tracker
+
+        return tracker
+
+    def get_transaction_by_id(
+        self, update_id, requesting_parties, *, transaction_shape=None
+    ):
+        if transaction_shape is None:
+            req = update_service_pb2.GetTransactionByIdRequest(
+                update_id=update_id,
+                requesting_parties=_ensure_list(requesting_parties),
+            )
+        else:
+            req = update_service_pb2.GetTransactionByIdRequest(
+                update_id=update_id,
+                transaction_format=transaction_format(
+                    requesting_parties, transaction_shape
+                ),
+            )
+
+        return decode(self._call("query", self._update_service.GetTransactionById, req))
+
+    def _fetch_transaction(self, completion, act_as):
+        return self.get_transaction_by_id(completion.update_id, act_as)
+
+    # Submit via CommandSubmissionService and return a Future that resolves
+    # to the decoded completion, or to the decoded transaction if
+    # fetch_transaction is set. Rejections fail the future with
+    # CommandRejected.
+    def submit_nowait(
         self,
         act_as,
         commands,
@@ -159,44 +835,144 @@ class LedgerConnection:
         command_id=None,
         deduplication_offset=None,
         disclosed_contracts=[],
+        fetch_transaction=False,
     ):
-        commands = commands_pb2.Commands(
-            user_id=self.user_id,
-            command_id=command_id or self._gen_command_id(),
-            act_as=_ensure_list(act_as),
-            commands=_ensure_list(commands),
+        tracker = self._completion_tracker(_ensure_list(act_as))
+
+        # As in submit(). The period is a duration, not the offset the
+        # completion stream started from: a long-lived connection would
+        # otherwise outgrow the participant's deduplication window.
+        deduplication_duration_sec = None
+        if deduplication_offset is None and self.retry_policy.retries_enabled:
+            deduplication_duration_sec = DEDUPLICATION_DURATION_SEC
+
+        commands = self._commands(
+            act_as,
+            commands,
+            command_id=command_id,
             deduplication_offset=deduplication_offset,
+            deduplication_duration_sec=deduplication_duration_sec,
             disclosed_contracts=disclosed_contracts,
         )
 
-        req = command_service_pb2.SubmitAndWaitRequest(commands=commands)
+        completion_future = tracker.track(commands.command_id)
 
-        return decode(self._command_service.SubmitAndWaitForTransaction(req))
+        req = command_submission_service_pb2.SubmitRequest(commands=commands)
+        compression = self._compression("submit")
+        deadline = self.retry_policy.deadline()
 
-    def _get_updates(self, begin_exclusive, end_inclusive, party, template_ids=[]):
+        def send(attempt):
+            self.retry_policy.stats.record(attempt=True)
+
+            self._command_submission_service.Submit.future(
+                req,
+                timeout=self.retry_policy.call_timeout(deadline),
+                compression=compression,
+            ).add_done_callback(lambda f: on_submitted(f, attempt))
+
+        def on_submitted(f, attempt):
+            e = f.exception()
+
+            if e is None:
+                return
+            elif attempt > 1 and e.code() == grpc.StatusCode.ALREADY_EXISTS:
+                # An earlier attempt was accepted; its completion will
+                # resolve the future.
+                return
+
+            delay = self.retry_policy.next_delay("submit", e, attempt, deadline)
+
+            if delay is not None:
+                threading.Timer(delay, send, [attempt + 1]).start()
+            elif tracker.untrack(commands.command_id):
+                completion_future.set_exception(e)
+
+        send(1)
+
+        if fetch_transaction:
+            if self._fetch_executor is None:
+                self._fetch_executor = ThreadPoolExecutor(thread_name_prefix="fetch-tx")
+
+            return _chain_future(
+                completion_future,
+                lambda c: self._fetch_transaction(c, list(commands.act_as)),
+                executor=self._fetch_executor,
+            )
+        else:
+            return _chain_future(completion_future, decode)
+
+    # With raw, each response is yielded as its serialized bytes.
+    def _iter_update_messages(
+        self, begin_exclusive, end_inclusive, party, template_ids=[], *, raw=False
+    ):
         req = update_service_pb2.GetUpdatesRequest(
             begin_exclusive=begin_exclusive,
             end_inclusive=end_inclusive,
             filter=self._get_transaction_filter(party, template_ids),
             verbose=True,
         )
+        service = self._raw_update_service if raw else self._update_service
 
-        for u in self._update_service.GetUpdates(req):
-            yield decode(u)
+        return service.GetUpdates(req, compression=self._compression("stream"))
 
+    def _get_updates(self, begin_exclusive, end_inclusive, party, template_ids=[]):
+        for u in self._iter_update_messages(
+            begin_exclusive, end_inclusive, party, template_ids
+        ):
+            yield self._decode(u)
+
+    def _get_updates_pipelined(
+        self, begin_exclusive, end_inclusive, party, template_ids=[]
+    ):
+        if self._decode_pool is None:
+            self._decode_pool = pipeline.decode_pool(self.decode_workers)
+
+        return pipeline.pipelined_decode(
+            self._decode_pool,
+            update_service_pb2.GetUpdatesResponse,
+            self._iter_update_messages(
+                begin_exclusive, end_inclusive, party, template_ids, raw=True
+            ),
+            window=2 * self.decode_workers,
+        )
+
+    # Decoding in worker processes holds results back until a chunk is
+    # complete, so it is only used for bounded histories, not live streams.
     def get_updates(self, party, template_ids=[]):
         offset_end = self.get_ledger_end()
-        return self._get_updates(0, offset_end, party, template_ids)
+
+        if self.decode_workers:
+            return self._get_updates_pipelined(0, offset_end, party, template_ids)
+        else:
+            return self._get_updates(0, offset_end, party, template_ids)
 
     def get_update_stream(self, party, template_ids=[]):
         offset_end = self.get_ledger_end()
         return self._get_updates(offset_end, None, party, template_ids)
 
+    def get_resumable_update_stream(self, party, checkpoint_path, template_ids=[]):
+        from .checkpoint import CheckpointFile, ResumableUpdateStream
+
+        return ResumableUpdateStream(
+            self,
+            party,
+            template_ids,
+            checkpoint=CheckpointFile(checkpoint_path),
+            retry_policy=self.retry_policy,
+        )
+
+
+def _encode_arguments(arguments):
+    if isinstance(arguments, CodecRecord):
+        return arguments.encode()
+    else:
+        return record(arguments)
+
 
 def create_contract(tid, create_arguments):
     return commands_pb2.Command(
         create=commands_pb2.CreateCommand(
-            template_id=tid, create_arguments=record({**create_arguments})
+            template_id=tid, create_arguments=_encode_arguments(create_arguments)
         )
     )
 
@@ -207,7 +983,7 @@ def exercise_contract_choice(tid, cid, choice, choice_arguments):
             template_id=tid,
             contract_id=cid,
             choice=choice,
-            choice_argument=value(record(choice_arguments)),
+            choice_argument=value(_encode_arguments(choice_arguments)),
         )
     )
 
@@ -216,18 +992,82 @@ def create_contract_and_exercise(tid, create_arguments, choice, choice_arguments
     return commands_pb2.Command(
         create_and_exercise=commands_pb2.CreateAndExerciseCommand(
             template_id=tid,
-            create_arguments=record({**create_arguments}),
+            create_arguments=_encode_arguments(create_arguments),
             choice=choice,
-            choice_argument=value(record(choice_arguments)),
+            choice_argument=value(_encode_arguments(choice_arguments)),
         )
     )
 
 
+# The argument record a command carries, by command kind.
+def _command_arguments(command):
+    kind = command.WhichOneof("command")
+
+    if kind == "create":
+        return command.create.create_arguments
+    elif kind == "exercise":
+        return command.exercise.choice_argument.record
+    elif kind == "create_and_exercise":
+        return command.create_and_exercise.create_arguments
+    else:
+        FAIL(f"Unsupported prototype command: {kind}")
+
+
+# A command encoded once, from which per-call variants are made by copying
+# the encoded message and setting only the fields that change:
+#
+#   issue = create_prototype(ASSET_ID, ASSET(owner, owner, ""))
+#   issue(name="widget-1")
+#
+#   give = exercise_prototype(ASSET_ID, "Give", {"newOwner": party(p)})
+#   give(contract_id)
+#
+# Changed fields are located by label in the template's create arguments
+# (for an exercise, the choice argument), so nested values are replaced
+# whole.
+class CommandPrototype:
+    def __init__(self, command):
+        self.command = command
+        self.kind = command.WhichOneof("command")
+        self._field_index = {
+            f.label: index for index, f in enumerate(_command_arguments(command).fields)
+        }
+
+    def __call__(self, contract_id=None, /, **arguments):
+        command = commands_pb2.Command()
+        command.CopyFrom(self.command)
+
+        if contract_id is not None:
+            if self.kind != "exercise":
+                FAIL(f"Contract id given for a {self.kind} prototype")
+
+            command.exercise.contract_id = contract_id
+
+        if arguments:
+            fields = _command_arguments(command).fields
+
+            for label, v in arguments.items():
+                index = self._field_index.get(label)
+
+                if index is None:
+                    FAIL(f"No field {label} in command prototype")
+
+                assign_value(fields[index].value, v)
+
+        return command
+
+
+def create_prototype(tid, create_arguments):
+    return CommandPrototype(create_contract(tid, create_arguments))
+
+
+def exercise_prototype(tid, choice, choice_arguments):
+    return CommandPrototype(exercise_contract_choice(tid, "", choice, choice_arguments))
+
+
 RETRYABLE_STATUS_CODES = [
     grpc.StatusCode.UNIMPLEMENTED,  # Possible at startup due to Canton initialization order
     grpc.StatusCode.UNAVAILABLE,
-    grpc.StatusCode.NOT_FOUND,
-    grpc.StatusCode.ALREADY_EXISTS,
     grpc.StatusCode.FAILED_PRECONDITION,
     grpc.StatusCode.DEADLINE_EXCEEDED,
     grpc.StatusCode.ABORTED,
@@ -237,23 +1077,10 @@ RETRYABLE_STATUS_CODES = [
 
 
 def retry_ledger_op(opfn, attempt_limit=3, retry_delay_sec=2):
-    current_error = None
-
-    attempt_num = 0
-    while attempt_num < attempt_limit:
-        attempt_num = attempt_num + 1
-
-        try:
-            return opfn()
-        except grpc.RpcError as e:
-            if e.code() in RETRYABLE_STATUS_CODES:
-                print("Retryable Error:", e)
-                current_error = e
-            else:
-                print("Non-retryable Error:", e)
-                raise e
-
-        time.sleep(retry_delay_sec)
+    policy = RetryPolicy(
+        max_attempts=attempt_limit,
+        initial_backoff_sec=retry_delay_sec,
+        retryable={"op": RETRYABLE_STATUS_CODES},
+    )
 
-    print(f"Limit on number of attempts ({attempt_limit}) exhausted. Not retrying")
-    raise current_error
+    return policy.call("op", lambda _: opfn())
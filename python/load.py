@@ -0,0 +1,290 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Load generation with latency histograms.
+#
+# run_load() calls an operation repeatedly from `concurrency` threads,
+# either closed loop (each thread starts its next iteration as soon as the
+# last one finishes) or open loop (iterations start at a fixed rate
+# whatever the ledger's response time, queueing behind the threads when it
+# falls behind). An operation times each of its steps with step(name, fn,
+# *args); iterations starting during the warm-up are run but not counted.
+#
+# The "iteration" latency of an open-loop run is measured from when the
+# iteration was due to start, so time spent queued is counted rather than
+# hidden (coordinated omission).
+
+import collections
+import itertools
+import math
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PRECISION_BITS = 11
+
+ITERATION = "iteration"
+COMMAND = "command"
+
+
+# Latency histogram with HdrHistogram-style log-linear buckets. Values
+# below 2**precision_bits are counted exactly; above that, each power of
+# two range is split into 2**(precision_bits - 1) buckets, bounding the
+# relative error of a reported value to 2**-(precision_bits - 1).
+class Histogram:
+    def __init__(self, precision_bits=DEFAULT_PRECISION_BITS):
+        self.precision_bits = precision_bits
+        self.counts = collections.Counter()
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, v):
+        shift = v.bit_length() - self.precision_bits
+
+        if shift <= 0:
+            return v
+        else:
+            half = 1 << (self.precision_bits - 1)
+            return (1 << self.precision_bits) + (shift - 1) * half + (v >> shift) - half
+
+    # The highest value counted in the bucket at index.
+    def _highest(self, index):
+        linear = 1 << self.precision_bits
+
+        if index < linear:
+            return index
+        else:
+            half = linear >> 1
+            shift, offset = divmod(index - linear, half)
+            return ((half + offset + 1) << (shift + 1)) - 1
+
+    def record(self, v):
+        self.counts[self._index(v)] += 1
+        self.count += 1
+        self.total += v
+        self.max = max(self.max, v)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def value_at_percentile(self, percentile):
+        if not self.count:
+            return 0
+
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+
+            if seen >= rank:
+                return min(self._highest(index), self.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+
+def error_name(e):
+    code = e.code() if hasattr(e, "code") else None
+
+    return code.name if hasattr(code, "name") else type(e).__name__
+
+
+# Latencies (recorded in microseconds) and errors, by step name.
+class LoadStats:
+    def __init__(self):
+        self.latency = collections.defaultdict(Histogram)
+        self.errors = collections.defaultdict(collections.Counter)
+
+        self._lock = threading.Lock()
+
+    def record(self, name, latency_sec):
+        with self._lock:
+            self.latency[name].record(int(latency_sec * 1e6))
+
+    def record_error(self, name, e):
+        with self._lock:
+            self.errors[name][error_name(e)] += 1
+
+    def summary(self, elapsed_sec):
+        names = sorted(set(self.latency) | set(self.errors))
+
+        return {name: self.step_summary(name, elapsed_sec) for name in names}
+
+    def step_summary(self, name, elapsed_sec):
+        h = self.latency.get(name) or Histogram()
+
+        def ms(us):
+            return round(us / 1000, 3)
+
+        return {
+            "count": h.count,
+            "errors": dict(self.errors.get(name, {})),
+            "throughput_per_sec": round(h.count / elapsed_sec, 3),
+            "mean_ms": ms(h.mean()),
+            "p50_ms": ms(h.value_at_percentile(50)),
+            "p90_ms": ms(h.value_at_percentile(90)),
+            "p99_ms": ms(h.value_at_percentile(99)),
+            "max_ms": ms(h.max),
+        }
+
+
+# Allows `rate` acquisitions per second, with bursts of up to `burst`
+# after a quiet period. Tokens can go negative: each caller reserves the
+# next free slot and sleeps until it comes round, so waiting callers are
+# served in order.
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+
+            wait = -self._tokens / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _Iteration:
+    def __init__(self, stats, measured):
+        self.stats = stats
+        self.measured = measured
+
+    # Runs fn(*args) as the named step. A failed step is counted as an
+    # error and ends the iteration.
+    def step(self, name, fn, *args):
+        start = time.monotonic()
+
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if self.measured:
+                self.stats.record_error(name, e)
+            raise
+
+        if self.measured:
+            self.stats.record(name, time.monotonic() - start)
+
+        return result
+
+
+def _run_iteration(operation, stats, due, measured):
+    iteration = _Iteration(stats, measured)
+
+    try:
+        operation(iteration.step)
+    except Exception as e:
+        if measured:
+            stats.record_error(ITERATION, e)
+        return
+
+    if measured:
+        stats.record(ITERATION, time.monotonic() - due)
+
+
+def run_load(operation, *, concurrency, duration_sec, warmup_sec=0, rate=None):
+    stats = LoadStats()
+
+    start = time.monotonic()
+    measure_start = start + warmup_sec
+    deadline = measure_start + duration_sec
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="load") as pool:
+        if rate is None:
+
+            def closed_loop():
+                while (due := time.monotonic()) < deadline:
+                    _run_iteration(operation, stats, due, due >= measure_start)
+
+            for _ in range(concurrency):
+                pool.submit(closed_loop)
+        else:
+            for n in itertools.count():
+                due = start + n / rate
+
+                if due >= deadline:
+                    break
+
+                time.sleep(max(0, due - time.monotonic()))
+                pool.submit(_run_iteration, operation, stats, due, due >= measure_start)
+
+    elapsed_sec = max(time.monotonic(), deadline) - measure_start
+
+    return {
+        "mode": "closed" if rate is None else "open",
+        "concurrency": concurrency,
+        "rate_per_sec": rate,
+        "warmup_sec": warmup_sec,
+        "duration_sec": duration_sec,
+        "elapsed_sec": round(elapsed_sec, 3),
+        "steps": stats.summary(elapsed_sec),
+    }
+
+
+# Calls operation() from `concurrency` threads until `count` calls have
+# been made or `duration_sec` has passed, whichever comes first, and at
+# most `rate` calls per second.
+def run_repeatedly(
+    operation, *, concurrency=1, count=None, duration_sec=None, rate=None
+):
+    stats = LoadStats()
+    bucket = TokenBucket(rate) if rate else None
+    calls = itertools.count()
+
+    limit = math.inf if count is None else count
+    start = time.monotonic()
+    deadline = math.inf if duration_sec is None else start + duration_sec
+
+    def worker():
+        while next(calls) < limit:
+            if bucket is not None:
+                bucket.acquire()
+
+            started = time.monotonic()
+
+            if started >= deadline:
+                return
+
+            try:
+                operation()
+            except Exception as e:
+                stats.record_error(COMMAND, e)
+            else:
+                stats.record(COMMAND, time.monotonic() - started)
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="repeatedly") as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+
+    elapsed_sec = time.monotonic() - start
+    summary = stats.step_summary(COMMAND, elapsed_sec)
+    calls_made = summary["count"] + sum(summary["errors"].values())
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_sec": round(elapsed_sec, 3),
+        "calls": calls_made,
+        "rate_per_sec": round(calls_made / elapsed_sec, 3),
+        **summary,
+    }
@@ -4,15 +4,21 @@
 # Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
 # SPDX-License-Identifier: BSD0
 
+import argparse
 import sys
 
-from .ledger import LedgerConnection
 from .config import Config, load_config
+from .util import FAIL
 
 from .commands import (
+    ASSET,
     init_context,
     cmd_allocate_party,
     cmd_archive_asset,
+    cmd_bench,
+    cmd_bulk_issue_asset,
+    cmd_export_contracts,
+    cmd_export_updates,
     cmd_give_asset,
     cmd_issue_asset,
     cmd_ledger_end,
@@ -26,14 +32,90 @@ from .commands import (
 )
 
 
-def cmd_repeatedly(ctx, count, *args):
-    for _ in range(0, int(count)):
-        do_command(ctx, args)
+def parse_rate(rate):
+    return float(rate.removesuffix("/s"))
+
+
+# repeatedly [--concurrency N] [--rate R[/s]] [--duration SEC] [COUNT] CMD ...
+#
+# Runs CMD COUNT times, or for SEC seconds if --duration is given without
+# a count, from N threads sharing the ledger connection, and at most R
+# commands per second.
+def cmd_repeatedly(ctx, *args):
+    parser = argparse.ArgumentParser(prog="repeatedly")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rate", type=parse_rate, default=None)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    opts = parser.parse_args(args)
+
+    command = opts.command
+    count = None
+
+    if command and command[0].isdigit():
+        count = int(command[0])
+        command = command[1:]
+    elif opts.duration is None:
+        FAIL("repeatedly needs a count or --duration")
+
+    if not command:
+        FAIL("repeatedly needs a command to run")
+
+    from .load import run_repeatedly
+
+    stats = run_repeatedly(
+        lambda: do_command(ctx, command),
+        concurrency=opts.concurrency,
+        count=count,
+        duration_sec=opts.duration,
+        rate=opts.rate,
+    )
+
+    failed = sum(stats["errors"].values())
+
+    print(
+        f"commands={stats['calls']} succeeded={stats['count']} failed={failed} "
+        f"elapsed={stats['elapsed_sec']:.3f}s rate={stats['rate_per_sec']:.1f}/s"
+    )
+    for code, n in sorted(stats["errors"].items()):
+        print(f"  failed {code}: {n}")
+
+    if stats["count"]:
+        print(
+            f"latency p50={stats['p50_ms']}ms p90={stats['p90_ms']}ms "
+            f"p99={stats['p99_ms']}ms max={stats['max_ms']}ms"
+        )
+
+
+# daemon [stop]
+#
+# Serves commands forwarded by ./run with CLI_DAEMON=1 set, reusing this
+# process's ledger connection and caches; see daemon.py. Normally started
+# on demand by the first forwarded command.
+def cmd_daemon(ctx, action="serve"):
+    from . import daemon
+
+    if action == "stop":
+        daemon.stop(daemon.socket_path())
+    elif action == "serve":
+
+        def run_command(argv):
+            args, options = parse_global_options(argv)
+            do_command(init_context(ctx.config, ctx.ledger, **options), args)
+
+        daemon.serve(daemon.socket_path(), run_command)
+    else:
+        FAIL(f"Unknown daemon action: {action} (expected serve or stop)")
 
 
 COMMAND_HANDLERS = {
     "allocate-party": cmd_allocate_party,
     "archive-asset": cmd_archive_asset,
+    "bench": cmd_bench,
+    "bulk-issue-asset": cmd_bulk_issue_asset,
+    "daemon": cmd_daemon,
+    "export-contracts": cmd_export_contracts,
+    "export-updates": cmd_export_updates,
     "give-asset": cmd_give_asset,
     "issue-asset": cmd_issue_asset,
     "ledger-end": cmd_ledger_end,
@@ -59,10 +141,77 @@ def do_command(ctx, args):
     COMMAND_HANDLERS.get(command, cmd_help)(ctx, *args[1:])
 
 
+def select_decoder(config):
+    if config.compactDecode:
+        from .compact import CompactDecoder
+
+        return CompactDecoder().decode
+    elif config.decode:
+        from .decoder import Decoder
+
+        return Decoder.from_config(config.decode).decode
+    else:
+        return None
+
+
+# Options accepted anywhere on the command line, ahead of the subcommand
+# arguments, by the context field each one sets:
+#
+#   --output pretty|ndjson   format of list and stream command output
+#   --flush-interval SEC     maximum delay before ndjson output is written
+GLOBAL_OPTIONS = {
+    "--output": "output_format",
+    "--flush-interval": "flush_interval_sec",
+}
+
+
+def parse_global_options(argv):
+    args = []
+    options = {}
+
+    argv = iter(argv)
+    for arg in argv:
+        name, eq, value = arg.partition("=")
+
+        if name not in GLOBAL_OPTIONS:
+            args.append(arg)
+            continue
+
+        if not eq:
+            value = next(argv, None)
+
+            if value is None:
+                FAIL(f"Missing value for option {name}")
+
+        options[GLOBAL_OPTIONS[name]] = value
+
+    return args, options
+
+
 def main():
     config = load_config()
+    args, options = parse_global_options(sys.argv[1:])
 
-    with LedgerConnection(config.ledgerAddress) as ledger:
-        ctx = init_context(config, ledger)
+    # Help needs no ledger, so it does not pay for importing gRPC.
+    if (args[0] if args else "help") not in COMMAND_HANDLERS:
+        cmd_help(None)
+        return
 
-        do_command(ctx, sys.argv[1:])
+    from .ledger import LedgerConnection
+    from .retry import RetryPolicy
+
+    if config.codecDecode:
+        ASSET.register()
+
+    with LedgerConnection(
+        config.ledgerAddress,
+        party_cache_ttl_sec=config.partyCacheTtlSec,
+        channel_config=config.channel,
+        retry_policy=RetryPolicy.from_config(config.retry) if config.retry else None,
+        lazy_decode=config.lazyDecode,
+        decoder=select_decoder(config),
+        decode_workers=config.decodeWorkers,
+    ) as ledger:
+        ctx = init_context(config, ledger, **options)
+
+        do_command(ctx, args)
@@ -0,0 +1,162 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Newline-delimited JSON output for the list and stream commands: one
+# compact object per line, encoded by the C json encoder and written in
+# large batches instead of being pretty-printed line by line.
+#
+# Decoded values map to JSON as Party -> party id, Decimal -> string
+# (keeping its precision), datetime -> ISO 8601, bytes -> base64, and
+# tuples -> arrays. Compact and codec records and lazy event views are
+# written as the dicts they stand for.
+
+import base64
+import datetime
+import decimal
+import json
+import threading
+
+from collections.abc import Mapping
+
+from google.protobuf.json_format import MessageToDict
+from google.protobuf.message import Message
+
+from .codec import CodecRecord
+from .compact import Compact
+from .value import Party
+
+DEFAULT_BUFFER_BYTES = 1024 * 1024
+DEFAULT_FLUSH_INTERVAL_SEC = 1.0
+
+
+def _base64(v):
+    return base64.b64encode(v).decode("ascii")
+
+
+JSON_ENCODERS = {
+    Party: lambda v: v.party,
+    decimal.Decimal: str,
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    bytes: _base64,
+    memoryview: _base64,
+}
+
+
+def json_default(v):
+    encoder = JSON_ENCODERS.get(type(v))
+
+    if encoder is not None:
+        return encoder(v)
+    elif isinstance(v, CodecRecord):
+        return v.as_dict()
+    elif isinstance(v, Compact):
+        # An event's kind is a class attribute, not a slot.
+        event = getattr(type(v), "event", None)
+        fields = {k: getattr(v, k) for k in v.__slots__}
+
+        return fields if event is None else {"event": event, **fields}
+    elif isinstance(v, Mapping):
+        return dict(v)
+    elif isinstance(v, Message):
+        return MessageToDict(v)
+    elif hasattr(v, "tolist"):
+        return v.tolist()
+    else:
+        raise TypeError(f"Cannot encode as JSON: {type(v)}")
+
+
+def _json_key(k):
+    if isinstance(k, str):
+        return k
+    elif type(k) in JSON_ENCODERS:
+        return JSON_ENCODERS[type(k)](k)
+    else:
+        return json.dumps(k, separators=(",", ":"), default=json_default)
+
+
+# JSON object keys must be strings, but a decoded gen_map can be keyed by
+# any value. Only needed for the (rare) objects that fail to encode.
+def _with_json_keys(v):
+    if isinstance(v, dict):
+        return {_json_key(k): _with_json_keys(e) for k, e in v.items()}
+    elif isinstance(v, (list, tuple)):
+        return [_with_json_keys(e) for e in v]
+    elif isinstance(v, (CodecRecord, Compact, Mapping)):
+        return _with_json_keys(json_default(v))
+    else:
+        return v
+
+
+# Lines are buffered and written once buffer_bytes have accumulated, or
+# at most flush_interval_sec after the first buffered line, so output from
+# a stream that has gone quiet is not held back indefinitely.
+class NdjsonWriter:
+    def __init__(
+        self,
+        stream,
+        *,
+        buffer_bytes=DEFAULT_BUFFER_BYTES,
+        flush_interval_sec=DEFAULT_FLUSH_INTERVAL_SEC,
+    ):
+        self.stream = stream
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval_sec = flush_interval_sec
+
+        self.count = 0
+
+        self._encode = json.JSONEncoder(
+            separators=(",", ":"), ensure_ascii=False, default=json_default
+        ).encode
+        self._lock = threading.Lock()
+        self._lines = []
+        self._size = 0
+        self._timer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def write(self, obj):
+        try:
+            line = self._encode(obj)
+        except TypeError:
+            line = self._encode(_with_json_keys(obj))
+
+        with self._lock:
+            self._lines.append(line)
+            self._size += len(line) + 1
+            self.count += 1
+
+            if self._size >= self.buffer_bytes:
+                self._flush()
+            elif self._timer is None and self.flush_interval_sec is not None:
+                self._timer = threading.Timer(self.flush_interval_sec, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def write_all(self, objs):
+        for obj in objs:
+            self.write(obj)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._lines:
+            self._lines.append("")
+            self.stream.write("\n".join(self._lines))
+            self._lines = []
+            self._size = 0
+
+        self.stream.flush()
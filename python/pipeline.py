@@ -0,0 +1,74 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Decoding of long message streams in worker processes. The reading
+# thread receives each message as the bytes on the wire, unparsed (see
+# RawUpdateServiceStub), and hands chunks of them to the pool, where
+# workers parse and decode them, so decoding scales with cores instead of
+# sharing the reader's GIL.
+#
+# Results come back in stream order. At most `window` chunks are in
+# flight: once the window is full the reader waits for the oldest chunk
+# and yields it before submitting more, which bounds the results held for
+# reordering however far ahead the other workers get.
+
+import collections
+
+import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+
+from .codec import register_codecs, registered_codecs
+from .util import process_pool
+from .value import decode
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+# UpdateService stub whose GetUpdates yields each response undeserialized,
+# as bytes, instead of a parsed GetUpdatesResponse.
+class RawUpdateServiceStub:
+    def __init__(self, channel):
+        self.GetUpdates = channel.unary_stream(
+            "/com.daml.ledger.api.v2.UpdateService/GetUpdates",
+            request_serializer=update_service_pb2.GetUpdatesRequest.SerializeToString,
+            response_deserializer=None,
+        )
+
+
+def decode_chunk(message_class, serialized):
+    return [decode(message_class.FromString(b)) for b in serialized]
+
+
+# Workers register the codecs registered here when the pool is created,
+# so records decode to the same classes as they would in this process.
+def decode_pool(workers=None):
+    return process_pool(
+        workers, initializer=register_codecs, initargs=(registered_codecs(),)
+    )
+
+
+# Decodes serialized messages of message_class, yielding the results in
+# order.
+def pipelined_decode(
+    pool, message_class, serialized, *, window, chunk_size=DEFAULT_CHUNK_SIZE
+):
+    pending = collections.deque()
+    chunk = []
+
+    for b in serialized:
+        chunk.append(b)
+
+        if len(chunk) >= chunk_size:
+            pending.append(pool.submit(decode_chunk, message_class, chunk))
+            chunk = []
+
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+
+    if chunk:
+        pending.append(pool.submit(decode_chunk, message_class, chunk))
+
+    while pending:
+        yield from pending.popleft().result()
@@ -0,0 +1,170 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+import grpc
+import random
+import threading
+import time
+
+# Errors where the request cannot have taken effect, or where repeating it
+# is harmless. Submissions are only safe to repeat because a retried
+# submit keeps its command_id and deduplication period, so the ledger
+# rejects a second copy of a command that did go through.
+TRANSIENT_STATUS_CODES = [
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+]
+
+RETRYABLE_BY_CALL_TYPE = {
+    "query": TRANSIENT_STATUS_CODES
+    + [
+        grpc.StatusCode.UNIMPLEMENTED,  # Possible at startup due to Canton initialization order
+    ],
+    "submit": TRANSIENT_STATUS_CODES,
+    "stream": [
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+    ],
+}
+
+
+class RetryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.by_code = {}
+
+    def record(self, *, attempt=False, retry=False, failure=False, code=None):
+        with self._lock:
+            self.attempts += int(attempt)
+            self.retries += int(retry)
+            self.failures += int(failure)
+
+            if code is not None:
+                self.by_code[code.name] = self.by_code.get(code.name, 0) + 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "by_code": dict(self.by_code),
+            }
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        *,
+        max_attempts=5,
+        initial_backoff_sec=0.1,
+        max_backoff_sec=10.0,
+        multiplier=2.0,
+        jitter=1.0,
+        call_timeout_sec=None,
+        total_timeout_sec=None,
+        retryable=RETRYABLE_BY_CALL_TYPE,
+    ):
+        self.max_attempts = max_attempts
+        self.initial_backoff_sec = initial_backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.call_timeout_sec = call_timeout_sec
+        self.total_timeout_sec = total_timeout_sec
+        self.retryable = retryable
+
+        self.stats = RetryStats()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_attempts=config.maxAttempts,
+            initial_backoff_sec=config.initialBackoffSec,
+            max_backoff_sec=config.maxBackoffSec,
+            call_timeout_sec=config.callTimeoutSec,
+            total_timeout_sec=config.totalTimeoutSec,
+        )
+
+    @property
+    def retries_enabled(self):
+        return self.max_attempts > 1
+
+    # Exponential backoff with a fraction `jitter` of each delay drawn at
+    # random, which spreads out clients that failed at the same moment.
+    def backoff(self, attempt):
+        base = min(
+            self.max_backoff_sec,
+            self.initial_backoff_sec * (self.multiplier ** (attempt - 1)),
+        )
+
+        return base * (1 - self.jitter) + random.uniform(0, base * self.jitter)
+
+    def is_retryable(self, call_type, e):
+        return _code(e) in self.retryable.get(call_type, [])
+
+    def deadline(self):
+        if self.total_timeout_sec is None:
+            return None
+        else:
+            return time.monotonic() + self.total_timeout_sec
+
+    def call_timeout(self, deadline):
+        if deadline is None:
+            return self.call_timeout_sec
+
+        remaining = max(deadline - time.monotonic(), 0)
+
+        if self.call_timeout_sec is None:
+            return remaining
+        else:
+            return min(self.call_timeout_sec, remaining)
+
+    # Returns the delay before the next attempt, or None if the error
+    # should be raised to the caller.
+    def next_delay(self, call_type, e, attempt, deadline):
+        if not self.is_retryable(call_type, e) or attempt >= self.max_attempts:
+            self.stats.record(failure=True, code=_code(e))
+            return None
+
+        delay = self.backoff(attempt)
+
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            self.stats.record(failure=True, code=_code(e))
+            return None
+
+        self.stats.record(retry=True, code=_code(e))
+        return delay
+
+    # Runs fn(timeout) until it succeeds, raises an error that is not
+    # retryable for this call type, or runs out of attempts or time.
+    def call(self, call_type, fn):
+        deadline = self.deadline()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self.stats.record(attempt=True)
+
+            try:
+                return fn(self.call_timeout(deadline))
+            except grpc.RpcError as e:
+                delay = self.next_delay(call_type, e, attempt, deadline)
+
+                if delay is None:
+                    raise
+
+            time.sleep(delay)
+
+
+def _code(e):
+    return e.code() if hasattr(e, "code") else None
@@ -0,0 +1,96 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
+
+from .ledger import _ensure_list
+from .pipeline import decode_chunk, decode_pool
+from .util import FAIL
+from .value import decode
+
+DECODE_CHUNK_SIZE = 500
+
+ACTIVE_CONTRACT = state_service_pb2.ActiveContract
+
+
+def snapshot_shards(parties, template_ids=[]):
+    return [
+        (p, [tid] if tid is not None else [])
+        for p in _ensure_list(parties)
+        for tid in (_ensure_list(template_ids) or [None])
+    ]
+
+
+# Loads one ACS snapshot as several concurrent GetActiveContracts streams,
+# one per (party, template) shard, all pinned to the same offset. Readers
+# run on threads and hand serialized contracts in chunks to a process pool
+# for decoding, so decode throughput scales with cores rather than being
+# bound to the reading thread. Contracts seen by more than one shard are
+# returned once.
+def load_active_contracts(
+    ledger,
+    parties,
+    template_ids=[],
+    *,
+    active_at_offset=None,
+    max_streams=8,
+    decode_workers=None,
+):
+    if active_at_offset is None:
+        active_at_offset = ledger.get_ledger_end()
+
+    shards = snapshot_shards(parties, template_ids)
+    if not shards:
+        FAIL("No parties given for ACS snapshot")
+
+    decode_workers = os.cpu_count() if decode_workers is None else decode_workers
+
+    def read_shard(decoder, shard):
+        party, shard_template_ids = shard
+        stream = ledger._iter_active_contract_messages(
+            party, shard_template_ids, active_at_offset=active_at_offset
+        )
+
+        if decoder is None:
+            return [[decode(c) for c in stream]]
+
+        chunks = []
+        chunk = []
+        for c in stream:
+            chunk.append(c.SerializeToString())
+
+            if len(chunk) >= DECODE_CHUNK_SIZE:
+                chunks.append(decoder.submit(decode_chunk, ACTIVE_CONTRACT, chunk))
+                chunk = []
+
+        if chunk:
+            chunks.append(decoder.submit(decode_chunk, ACTIVE_CONTRACT, chunk))
+
+        return [f.result() for f in chunks]
+
+    if decode_workers:
+        decoder = decode_pool(decode_workers)
+    else:
+        decoder = None
+
+    try:
+        with ThreadPoolExecutor(min(max_streams, len(shards))) as readers:
+            results = list(readers.map(lambda s: read_shard(decoder, s), shards))
+    finally:
+        if decoder is not None:
+            decoder.shutdown()
+
+    contracts = {}
+    for shard_chunks in results:
+        for chunk in shard_chunks:
+            for c in chunk:
+                contracts.setdefault(c["contract_id"], c)
+
+    return active_at_offset, list(contracts.values())
@@ -0,0 +1,212 @@
+# Copyright (c) 2025 Digital Asset (Switzerland) GmbH and/or its
+# affiliates. All rights reserved.
+#
+# Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
+# SPDX-License-Identifier: BSD0
+
+# Cold start benchmark for ./run. Run with:
+#
+#   PYTHONPATH=target/_gen .venv/bin/python3 -m python.startup_bench
+#
+# to print the time taken to import the program (the cumulative time
+# `python -X importtime` reports for python.main) and the wall clock time
+# of a fresh `python -m python <command>` for a few cheap subcommands,
+# each the best of --runs runs. Commands run against an in-process fake
+# ledger, so the times are the client's own.
+#
+# --record writes budgets (the measured times plus --headroom, default
+# 50%) to startup_budget.json, and --check exits non-zero if anything
+# takes longer than its budget, or if the budget was recorded with
+# another Python release. This is what `make bench-startup` runs.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from .fake_ledger import FakeLedgerState, start_fake_ledger
+
+DEFAULT_BUDGET = Path(__file__).parent / "startup_budget.json"
+DEFAULT_RUNS = 5
+DEFAULT_HEADROOM = 0.5
+
+PROJECT_DIR = Path(__file__).parent.parent
+PACKAGE = __package__
+
+IMPORT = "import"
+
+COMMANDS = {
+    "help": ["help"],
+    "version": ["version"],
+    "ledger-end": ["ledger-end"],
+    "list-parties": ["list-parties"],
+    "list-local-parties": ["list-local-parties"],
+    "list-contracts": ["list-contracts", "alice"],
+}
+
+
+def _env():
+    env = dict(os.environ)
+
+    # Measure a cold start, not a command forwarded to a running daemon.
+    env.pop("CLI_DAEMON", None)
+    env.pop("EXTRA_CONFIG", None)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(PROJECT_DIR), *filter(None, [env.get("PYTHONPATH")])]
+    )
+
+    return env
+
+
+# The cumulative import time of python.main in ms, from the last line of
+# `python -X importtime` output that names it.
+def import_ms(env, cwd):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {PACKAGE}.main"],
+        env=env,
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    for line in reversed(result.stderr.splitlines()):
+        _, _, cumulative, name = (f.strip() for f in line.replace(":", "|").split("|"))
+
+        if name == f"{PACKAGE}.main":
+            return int(cumulative) / 1000
+
+    raise RuntimeError(f"No import time reported for {PACKAGE}.main")
+
+
+def command_ms(argv, env, cwd):
+    start = time.monotonic()
+
+    subprocess.run(
+        [sys.executable, "-m", PACKAGE, *argv],
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+    return (time.monotonic() - start) * 1000
+
+
+# Best of `runs` times, in ms, for the import and each named command.
+def measure(names, runs):
+    state = FakeLedgerState()
+    state.generate_history(["alice", "bob"], 10)
+
+    server, _, addr = start_fake_ledger(state=state)
+
+    try:
+        with tempfile.TemporaryDirectory() as cwd:
+            with open(Path(cwd) / "config.json", "w") as f:
+                json.dump({"ledgerAddress": addr}, f)
+
+            env = _env()
+
+            results = {IMPORT: min(import_ms(env, cwd) for _ in range(runs))}
+
+            for name in names:
+                results[name] = min(
+                    command_ms(COMMANDS[name], env, cwd) for _ in range(runs)
+                )
+
+            return results
+    finally:
+        server.stop(0)
+
+
+def load_budget(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"ms": {}}
+
+
+def record_budget(path, results, headroom):
+    budget = load_budget(path)
+
+    budget["python"] = platform.python_version()
+    budget["machine"] = platform.machine()
+
+    for name, ms in results.items():
+        budget["ms"][name] = round(ms * (1 + headroom))
+        print(f"{name:20} {ms:8.1f} ms  budget {budget['ms'][name]:6} ms")
+
+    with open(path, "w") as f:
+        json.dump(budget, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+# Returns the names of what took longer than its budget.
+def check_budget(path, results):
+    budget = load_budget(path)
+    over = []
+
+    # Start times under another Python release say nothing about this code.
+    recorded = budget.get("python", "")
+    if recorded.split(".")[:2] != list(platform.python_version_tuple()[:2]):
+        sys.exit(
+            f"Budget recorded with Python {recorded}, running "
+            f"{platform.python_version()}: re-record it (make bench-startup-budget) "
+            "or run the project's .venv"
+        )
+
+    for name, ms in results.items():
+        limit = budget["ms"].get(name)
+
+        if limit is None:
+            print(f"{name:20} {ms:8.1f} ms  no budget")
+            continue
+
+        status = ""
+        if ms > limit:
+            status = "OVER BUDGET"
+            over.append(name)
+
+        print(f"{name:20} {ms:8.1f} ms  budget {limit:6} ms {status}")
+
+    return over
+
+
+def main(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog="startup_bench")
+    parser.add_argument("commands", nargs="*")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_true")
+    mode.add_argument("--check", action="store_true")
+    parser.add_argument("--budget", type=Path, default=DEFAULT_BUDGET)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--headroom", type=float, default=DEFAULT_HEADROOM)
+    opts = parser.parse_args(argv)
+
+    for name in opts.commands:
+        if name not in COMMANDS:
+            parser.error(f"unknown command: {name} (expected one of {list(COMMANDS)})")
+
+    results = measure(opts.commands or list(COMMANDS), opts.runs)
+
+    if opts.record:
+        record_budget(opts.budget, results, opts.headroom)
+    elif opts.check:
+        over = check_budget(opts.budget, results)
+
+        if over:
+            sys.exit(f"{len(over)} over the startup budget: {', '.join(over)}")
+    else:
+        for name, ms in results.items():
+            print(f"{name:20} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@
 # Copyright 2025 Digital Asset (Switzerland) GmbH and/or its affiliates
 # SPDX-License-Identifier: BSD0
 
+import importlib
+import threading
+
 
 def FAIL(msg):
     raise RuntimeError(msg)
@@ -20,3 +23,42 @@ def to_boolean(x):
         return False
     else:
         raise Exception(f"Invalid argument for to_boolean: {x}")
+
+
+# Stands in for a module that is imported on first attribute access, so
+# startup only pays for the generated modules a command actually uses.
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        module = self._module
+
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+
+                module = self._module
+
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+
+# gRPC does not survive fork() while its threads are running, so worker
+# processes are started from a clean forkserver instead.
+def process_pool(max_workers=None, *, initializer=None, initargs=()):
+    import multiprocessing
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=initializer,
+        initargs=initargs,
+    )
@@ -6,26 +6,48 @@
 
 import datetime
 import decimal
+import functools
 import json
 
-import com.daml.ledger.api.v2.command_service_pb2 as command_service_pb2
-import com.daml.ledger.api.v2.commands_pb2 as commands_pb2
-import com.daml.ledger.api.v2.event_pb2 as event_pb2
-import com.daml.ledger.api.v2.state_service_pb2 as state_service_pb2
-import com.daml.ledger.api.v2.transaction_pb2 as transaction_pb2
-import com.daml.ledger.api.v2.update_service_pb2 as update_service_pb2
+from collections.abc import Mapping
+from operator import attrgetter
+
 import com.daml.ledger.api.v2.value_pb2 as value_pb2
 
 from dataclasses import dataclass
 
-from .util import FAIL
+from .util import FAIL, LazyModule
+
+# Values are encoded everywhere, but the messages they arrive in are only
+# imported once something is decoded (see MessageTable).
+command_service_pb2 = LazyModule("com.daml.ledger.api.v2.command_service_pb2")
+commands_pb2 = LazyModule("com.daml.ledger.api.v2.commands_pb2")
+completion_pb2 = LazyModule("com.daml.ledger.api.v2.completion_pb2")
+event_pb2 = LazyModule("com.daml.ledger.api.v2.event_pb2")
+state_service_pb2 = LazyModule("com.daml.ledger.api.v2.state_service_pb2")
+transaction_pb2 = LazyModule("com.daml.ledger.api.v2.transaction_pb2")
+update_service_pb2 = LazyModule("com.daml.ledger.api.v2.update_service_pb2")
 
 MICROSEC_PER_SEC = 1000000
 
+PARTY_CACHE_SIZE = 65536
+
+UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
 NumericStr = str
 
 DA_TYPES_ID = "5aee9b21b8e9a4c4975b5f4c4198e6e6e8469df49e2010820e792f393db870f4"
 
+# DA.Types tuple record identifiers by arity, and their field labels.
+TUPLE_IDS = {
+    arity: value_pb2.Identifier(
+        package_id=DA_TYPES_ID, module_name="DA.Types", entity_name=f"Tuple{arity}"
+    )
+    for arity in range(1, 21)
+}
+
+TUPLE_LABELS = tuple(f"_{index}" for index in range(1, 21))
+
 REL_TIME_ID = value_pb2.Identifier(
     package_id="b70db8369e1c461d5c70f1c86f526a29e9776c655e6ffc2560f95b05ccb8b946",
     module_name="DA.Time.Types",
@@ -40,17 +62,27 @@ REL_TIME_ID = value_pb2.Identifier(
 class Party:
     party: "str"
 
+    # Pickles as a constructor call, which is much smaller and faster to
+    # load than the default for a frozen dataclass.
+    def __reduce__(self):
+        return (Party, (self.party,))
+
 
 def party(party):
     return Party(party=party)
 
 
 def reltime(microseconds=0, milliseconds=0, seconds=0):
-    return record(
-        {
-            "__record_id": REL_TIME_ID,
-            "microseconds": ((seconds * 1000) + milliseconds) * 1000 + microseconds,
-        }
+    return value_pb2.Record(
+        record_id=REL_TIME_ID,
+        fields=[
+            value_pb2.RecordField(
+                label="microseconds",
+                value=value_pb2.Value(
+                    int64=((seconds * 1000) + milliseconds) * 1000 + microseconds
+                ),
+            )
+        ],
     )
 
 
@@ -92,20 +124,17 @@ def _encode_list(v):
 
 
 def _encode_tuple(v):
-    arity = len(v)
+    type_id = TUPLE_IDS.get(len(v))
 
-    if arity < 1 or arity > 20:
-        FAIL(f"No tuple type with {arity} slots")
-
-    type_id = value_pb2.Identifier(
-        package_id=DA_TYPES_ID, module_name="DA.Types", entity_name=f"Tuple{arity}"
-    )
+    if type_id is None:
+        FAIL(f"No tuple type with {len(v)} slots")
 
-    return record(
-        {
-            "__record_id": type_id,
-            **{f"_{index}": value for (value, index) in zip(v, range(1, arity + 1))},
-        }
+    return value_pb2.Record(
+        record_id=type_id,
+        fields=[
+            value_pb2.RecordField(label=label, value=value(slot))
+            for label, slot in zip(TUPLE_LABELS, v)
+        ],
     )
 
 
@@ -148,18 +177,33 @@ def value(v):
 
 
 def record(fields):
-    fields = fields.copy()
-    record_id = fields.pop("__record_id", None)
-
     return value_pb2.Record(
-        record_id=record_id,
+        record_id=fields.get("__record_id"),
         fields=[
-            value_pb2.RecordField(label=key, value=value(fields[key]))
-            for key in fields.keys()
+            value_pb2.RecordField(label=key, value=value(v))
+            for key, v in fields.items()
+            if key != "__record_id"
         ],
     )
 
 
+# Value fields set directly for scalars, by exact Python type.
+SCALAR_VALUE_FIELDS = {bool: "bool", int: "int64", str: "text"}
+
+
+# Sets Value target in place to the encoding of v. Scalars are assigned
+# directly rather than through a temporary Value.
+def assign_value(target, v):
+    field = SCALAR_VALUE_FIELDS.get(type(v))
+
+    if field is not None:
+        setattr(target, field, v)
+    elif type(v) is Party:
+        target.party = v.party
+    else:
+        target.CopyFrom(value(v))
+
+
 ### Value Decoding
 
 
@@ -169,44 +213,133 @@ def DECODE_FAIL(v, message=None):
     FAIL(f"Cannot decode value. {extra_msg}Type: {type(v)}")
 
 
-def decode_active_contract(v):
+# Event and transaction dicts, built around the decoding of the values in
+# them, so that decode() and decoder.Decoder produce the same dicts and a
+# field is added in one place.
+
+
+def active_contract_dict(v, decode_created_event):
     return {
         "reassignment_counter": v.reassignment_counter,
-        **decode(v.created_event),
+        **decode_created_event(v.created_event),
     }
 
 
-def decode_party_list(parties):
-    return [party(p) for p in parties]
+def created_event_dict(v, decode_create_arguments):
+    return {
+        "event": "created",
+        "offset": v.offset,
+        "node_id": v.node_id,
+        "contract_id": v.contract_id,
+        "template_id": decode_identifier(v.template_id),
+        "witness_parties": decode_party_list(v.witness_parties),
+        "signatories": decode_party_list(v.signatories),
+        "observers": decode_party_list(v.observers),
+        "package_name": v.package_name,
+        "interface_views": list(v.interface_views),
+        "create_arguments": decode_create_arguments(v),
+        "created_event_blob": v.created_event_blob,
+    }
 
 
-def decode_archived_event(v):
+def exercised_event_dict(v, decode_value):
     return {
-        "event": "archived",
+        "event": "exercised",
         "offset": v.offset,
+        "node_id": v.node_id,
+        "last_descendant_node_id": v.last_descendant_node_id,
         "contract_id": v.contract_id,
-        "template_id": decode(v.template_id),
+        "template_id": decode_identifier(v.template_id),
+        "choice": v.choice,
+        "choice_argument": decode_value(v.choice_argument),
+        "acting_parties": decode_party_list(v.acting_parties),
+        "consuming": v.consuming,
         "witness_parties": decode_party_list(v.witness_parties),
+        "exercise_result": decode_value(v.exercise_result),
         "package_name": v.package_name,
     }
 
 
-def decode_created_event(v):
+def event_dict(v, event_decoders):
+    kind = v.WhichOneof("event")
+    decoder = event_decoders.get(kind)
+
+    if decoder is None:
+        DECODE_FAIL(v)
+    else:
+        return decoder(getattr(v, kind))
+
+
+def transaction_dict(v, decode_event):
     return {
-        "event": "created",
+        "update_id": v.update_id,
+        "command_id": v.command_id,
+        "workflow_id": v.workflow_id,
         "offset": v.offset,
+        "events": [decode_event(e) for e in v.events],
+    }
+
+
+def updates_response_dict(v, decode_transaction):
+    kind = v.WhichOneof("update")
+
+    if kind == "transaction":
+        return decode_transaction(v.transaction)
+    elif kind == "reassignment":
+        DECODE_FAIL(v, "domain reassignments not currently supported")
+    else:
+        DECODE_FAIL(v)
+
+
+def decode_active_contract(v):
+    return active_contract_dict(v, decode_created_event)
+
+
+def decode_party_list(parties):
+    return [decode_party(p) for p in parties]
+
+
+def decode_archived_event(v):
+    return {
+        "event": "archived",
+        "offset": v.offset,
+        "node_id": v.node_id,
         "contract_id": v.contract_id,
-        "template_id": decode(v.template_id),
+        "template_id": decode_identifier(v.template_id),
         "witness_parties": decode_party_list(v.witness_parties),
-        "signatories": decode_party_list(v.signatories),
-        "observers": decode_party_list(v.observers),
         "package_name": v.package_name,
-        "interface_views": v.interface_views,
-        "create_arguments": decode(v.create_arguments),
-        "created_event_blob": v.created_event_blob,
     }
 
 
+# Specialized create_arguments decoders registered by TemplateCodec, keyed
+# by ("id", package_id) or ("name", package_name) followed by the module
+# and entity name.
+TEMPLATE_DECODERS = {}
+
+
+def decode_create_arguments(v):
+    if TEMPLATE_DECODERS:
+        tid = v.template_id
+        decoder = TEMPLATE_DECODERS.get(
+            ("name", v.package_name, tid.module_name, tid.entity_name)
+        ) or TEMPLATE_DECODERS.get(
+            ("id", tid.package_id, tid.module_name, tid.entity_name)
+        )
+
+        if decoder is not None:
+            return decoder(v.create_arguments)
+
+    return decode_record_any_depth(v.create_arguments)
+
+
+def decode_created_event(v):
+    return created_event_dict(v, decode_create_arguments)
+
+
+def decode_exercised_event(v):
+    return exercised_event_dict(v, decode_value_any_depth)
+
+
 def disclosure(c):
     return commands_pb2.DisclosedContract(
         template_id=value_pb2.Identifier(**c["template_id"]),
@@ -223,8 +356,12 @@ def decode_identifier(v):
     }
 
 
+def format_tid(tid):
+    return f'{tid["module_name"]}:{tid["entity_name"]}'
+
+
 def decode_list(v):
-    return [decode(e) for e in v.elements]
+    return [decode_value(e) for e in v.elements]
 
 
 def get_tuple_arity(rid):
@@ -237,10 +374,7 @@ def get_tuple_arity(rid):
 def decode_record(v):
     tuple_arity = get_tuple_arity(v.record_id)
 
-    record_dict = {
-        #'__record_id': v.record_id,
-        **{f.label: decode(f.value) for f in v.fields}
-    }
+    record_dict = {f.label: decode_value(f.value) for f in v.fields}
 
     if tuple_arity:
         return tuple([record_dict[f"_{index}"] for index in range(1, tuple_arity + 1)])
@@ -249,121 +383,450 @@ def decode_record(v):
 
 
 def decode_genmap(v):
-    return {decode(e.key): decode(e.value) for e in v.entries}
+    return {decode_value(e.key): decode_value(e.value) for e in v.entries}
 
 
 def decode_optional(v):
     if v.HasField("value"):
-        return decode(v.value)
+        return decode_value(v.value)
     else:
         return None
 
 
+# Integer arithmetic on the microseconds keeps full precision across the
+# whole timestamp range, where a float division would round.
 def decode_timestamp(v):
-    return datetime.datetime.fromtimestamp(
-        v / MICROSEC_PER_SEC, tz=datetime.timezone.utc
-    )
+    return UNIX_EPOCH + datetime.timedelta(0, 0, v)
 
 
 def decode_numeric(v):
     return decimal.Decimal(v)
 
 
+# Party is immutable, so decoding shares one object per party id. This
+# is cheaper than constructing a frozen dataclass per occurrence, and
+# pickles (e.g. from decode workers) store each party once per message.
+@functools.lru_cache(maxsize=PARTY_CACHE_SIZE)
 def decode_party(v):
     return Party(party=v)
 
 
-def decode_value(v):
-    if v.HasField("bool"):
-        return v.bool
+def _decode_scalar(v):
+    return v
 
-    elif v.HasField("int64"):
-        return v.int64
 
-    elif v.HasField("text"):
-        return v.text
+# Decoders for the populated member of the Value.sum oneof, applied to
+# that member. Kinds without an entry (unit, date, text_map, variant,
+# enum) are returned as the undecoded Value.
+VALUE_DECODERS = {
+    "bool": _decode_scalar,
+    "int64": _decode_scalar,
+    "text": _decode_scalar,
+    "timestamp": decode_timestamp,
+    "party": decode_party,
+    "contract_id": _decode_scalar,
+    "optional": decode_optional,
+    "numeric": decode_numeric,
+    "gen_map": decode_genmap,
+    "list": decode_list,
+    "record": decode_record,
+}
 
-    elif v.HasField("timestamp"):
-        return decode_timestamp(v.timestamp)
 
-    elif v.HasField("party"):
-        return decode_party(v.party)
+def decode_value(v):
+    kind = v.WhichOneof("sum")
+    decoder = VALUE_DECODERS.get(kind)
+
+    if decoder is None:
+        return v
+    else:
+        return decoder(getattr(v, kind))
 
-    elif v.HasField("contract_id"):
-        return v.contract_id
 
-    elif v.HasField("optional"):
-        return decode_optional(v.optional)
+def _finish_root(results, _):
+    return results[0]
 
-    elif v.HasField("numeric"):
-        return decode_numeric(v.numeric)
 
-    elif v.HasField("gen_map"):
-        return decode_genmap(v.gen_map)
+def _finish_list(results, _):
+    return results
 
-    elif v.HasField("list"):
-        return decode(v.list)
 
-    elif v.HasField("record"):
-        return decode_record(v.record)
+def _finish_genmap(results, _):
+    return dict(zip(results[::2], results[1::2]))
 
+
+def _finish_record(results, record_shape):
+    labels, tuple_arity = record_shape
+    record_dict = dict(zip(labels, results))
+
+    if tuple_arity:
+        return tuple([record_dict[f"_{index}"] for index in range(1, tuple_arity + 1)])
     else:
-        return v
+        return record_dict
+
+
+def _open_list(v):
+    return iter(v.elements), _finish_list, None
+
+
+def _open_genmap(v):
+    return (x for e in v.entries for x in (e.key, e.value)), _finish_genmap, None
+
+
+def _open_record(v):
+    labels = []
+    values = []
+
+    for f in v.fields:
+        labels.append(f.label)
+        values.append(f.value)
+
+    return iter(values), _finish_record, (labels, get_tuple_arity(v.record_id))
+
+
+# Kinds whose decoded value is the oneof member itself.
+PLAIN_SCALARS = frozenset(["bool", "int64", "text", "contract_id"])
+
+# Container kinds, opened into an iterator over their child values, the
+# function building the result from the decoded children, and its argument.
+VALUE_CONTAINERS = {
+    "list": _open_list,
+    "gen_map": _open_genmap,
+    "record": _open_record,
+}
+
+
+# Runs a stack of open containers to completion, returning the result of
+# the outermost. Scalars are decoded in the loop over their container's
+# children, so cost per element is flat, and depth is bounded by memory
+# rather than the recursion limit.
+def _decode_stack(stack):
+    push = stack.append
+    containers = VALUE_CONTAINERS
+    decoders = VALUE_DECODERS
+
+    while True:
+        children, finish, arg, results = stack[-1]
+        append = results.append
+
+        for v in children:
+            kind = v.WhichOneof("sum")
+
+            # An optional is unwrapped in place rather than taking a frame.
+            while kind == "optional" and v.optional.HasField("value"):
+                v = v.optional.value
+                kind = v.WhichOneof("sum")
+
+            if kind in PLAIN_SCALARS:
+                append(getattr(v, kind))
+            elif kind in containers:
+                push((*containers[kind](getattr(v, kind)), []))
+                break
+            elif kind == "optional":
+                append(None)
+            else:
+                decoder = decoders.get(kind)
+                append(v if decoder is None else decoder(getattr(v, kind)))
+        else:
+            stack.pop()
+            result = finish(results, arg)
+
+            if not stack:
+                return result
+
+            stack[-1][3].append(result)
+
+
+# Same results as decode_value() and decode_record(), without recursion.
+def decode_value_iterative(v):
+    return _decode_stack([(iter([v]), _finish_root, None, [])])
+
+
+def decode_record_iterative(v):
+    return _decode_stack([(*_open_record(v), [])])
+
+
+# The recursive decoders are faster for the shallow values most templates
+# have, but each level of nesting takes several interpreter frames. A
+# value too deep for the recursion limit is decoded again iteratively.
+def decode_value_any_depth(v):
+    try:
+        return decode_value(v)
+    except RecursionError:
+        return decode_value_iterative(v)
+
+
+def decode_record_any_depth(v):
+    try:
+        return decode_record(v)
+    except RecursionError:
+        return decode_record_iterative(v)
+
+
+EVENT_DECODERS = {
+    "created": decode_created_event,
+    "archived": decode_archived_event,
+    "exercised": decode_exercised_event,
+}
 
 
 def decode_event(v):
-    if v.HasField("created"):
-        return decode(v.created)
-    elif v.HasField("archived"):
-        return decode(v.archived)
-    else:
-        DECODE_FAIL(v)
+    return event_dict(v, EVENT_DECODERS)
 
 
 def decode_transaction(v):
+    return transaction_dict(v, decode_event)
+
+
+def decode_completion(v):
     return {
-        "update_id": v.update_id,
         "command_id": v.command_id,
-        "workflow_id": v.workflow_id,
+        "update_id": v.update_id,
         "offset": v.offset,
-        "events": [decode_event(e) for e in v.events],
+        "act_as": decode_party_list(v.act_as),
     }
 
 
 def decode_updates_response(v):
-    if v.HasField("transaction"):
-        return decode_transaction(v.transaction)
-    elif v.HasField("reassignment"):
-        DECODE_FAIL(v, "domain reassignments not currently supported")
+    return updates_response_dict(v, decode_transaction)
+
+
+def _decode_transaction_response(v):
+    return decode_transaction(v.transaction)
+
+
+# Decoders keyed by exact message type; generated message classes are not
+# subclassed, so this matches what the isinstance checks would. The table
+# is filled by build() on the first lookup, which imports the message
+# modules, and a type it does not hold maps to None.
+class MessageTable(dict):
+    def __init__(self, build):
+        super().__init__()
+        self._build = build
+
+    def __missing__(self, key):
+        build = self._build
+
+        if build is not None:
+            self.update(build())
+            self._build = None
+
+        return self.get(key)
+
+
+def _decoders():
+    return {
+        state_service_pb2.ActiveContract: decode_active_contract,
+        event_pb2.ArchivedEvent: decode_archived_event,
+        event_pb2.CreatedEvent: decode_created_event,
+        event_pb2.ExercisedEvent: decode_exercised_event,
+        value_pb2.Identifier: decode_identifier,
+        value_pb2.Record: decode_record_any_depth,
+        value_pb2.List: decode_list,
+        value_pb2.Value: decode_value_any_depth,
+        event_pb2.Event: decode_event,
+        transaction_pb2.Transaction: decode_transaction,
+        command_service_pb2.SubmitAndWaitForTransactionResponse: _decode_transaction_response,
+        update_service_pb2.GetUpdatesResponse: decode_updates_response,
+        update_service_pb2.GetTransactionResponse: _decode_transaction_response,
+        completion_pb2.Completion: decode_completion,
+    }
+
+
+DECODERS = MessageTable(_decoders)
+
+
+def decode(v):
+    decoder = DECODERS[type(v)]
+
+    if decoder is None:
+        DECODE_FAIL(v)
     else:
+        return decoder(v)
+
+
+### Lazy Decoding
+
+
+# Read-only mapping over an event message, with the same keys as the
+# eagerly decoded dict. Each field is decoded on first access and
+# memoized, so consumers only pay for the fields they read.
+class EventView(Mapping):
+    __slots__ = ("_v", "_decoded")
+
+    FIELDS = {}
+
+    def __init__(self, v):
+        self._v = v
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+
+        decoded = self._decoded[key] = self.FIELDS[key](self._v)
+        return decoded
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _constant(value):
+    return lambda _: value
+
+
+def _party_list(name):
+    return lambda v: decode_party_list(getattr(v, name))
+
+
+# The blob is exposed as a memoryview over the bytes read from the
+# message, so slicing or handing it on does not copy it again.
+def _blob(v):
+    return memoryview(v.created_event_blob)
+
+
+class ArchivedEventView(EventView):
+    __slots__ = ()
+
+    FIELDS = {
+        "event": _constant("archived"),
+        "offset": attrgetter("offset"),
+        "node_id": attrgetter("node_id"),
+        "contract_id": attrgetter("contract_id"),
+        "template_id": lambda v: decode_identifier(v.template_id),
+        "witness_parties": _party_list("witness_parties"),
+        "package_name": attrgetter("package_name"),
+    }
+
+
+class CreatedEventView(EventView):
+    __slots__ = ()
+
+    FIELDS = {
+        "event": _constant("created"),
+        "offset": attrgetter("offset"),
+        "node_id": attrgetter("node_id"),
+        "contract_id": attrgetter("contract_id"),
+        "template_id": lambda v: decode_identifier(v.template_id),
+        "witness_parties": _party_list("witness_parties"),
+        "signatories": _party_list("signatories"),
+        "observers": _party_list("observers"),
+        "package_name": attrgetter("package_name"),
+        "interface_views": lambda v: list(v.interface_views),
+        "create_arguments": decode_create_arguments,
+        "created_event_blob": _blob,
+    }
+
+
+class ExercisedEventView(EventView):
+    __slots__ = ()
+
+    FIELDS = {
+        "event": _constant("exercised"),
+        "offset": attrgetter("offset"),
+        "node_id": attrgetter("node_id"),
+        "last_descendant_node_id": attrgetter("last_descendant_node_id"),
+        "contract_id": attrgetter("contract_id"),
+        "template_id": lambda v: decode_identifier(v.template_id),
+        "choice": attrgetter("choice"),
+        "choice_argument": lambda v: decode_value_any_depth(v.choice_argument),
+        "acting_parties": _party_list("acting_parties"),
+        "consuming": attrgetter("consuming"),
+        "witness_parties": _party_list("witness_parties"),
+        "exercise_result": lambda v: decode_value_any_depth(v.exercise_result),
+        "package_name": attrgetter("package_name"),
+    }
+
+
+def _of_created_event(decode_field):
+    return lambda v: decode_field(v.created_event)
+
+
+class ActiveContractView(EventView):
+    __slots__ = ()
+
+    FIELDS = {
+        "reassignment_counter": attrgetter("reassignment_counter"),
+        **{
+            key: _of_created_event(decode_field)
+            for key, decode_field in CreatedEventView.FIELDS.items()
+        },
+    }
+
+
+LAZY_EVENT_VIEWS = {
+    "created": CreatedEventView,
+    "archived": ArchivedEventView,
+    "exercised": ExercisedEventView,
+}
+
+
+def decode_event_lazy(v):
+    kind = v.WhichOneof("event")
+    view = LAZY_EVENT_VIEWS.get(kind)
+
+    if view is None:
         DECODE_FAIL(v)
+    else:
+        return view(getattr(v, kind))
 
 
-def decode(v):
-    if isinstance(v, state_service_pb2.ActiveContract):
-        return decode_active_contract(v)
-    elif isinstance(v, event_pb2.ArchivedEvent):
-        return decode_archived_event(v)
-    elif isinstance(v, event_pb2.CreatedEvent):
-        return decode_created_event(v)
-    elif isinstance(v, value_pb2.Identifier):
-        return decode_identifier(v)
-    elif isinstance(v, value_pb2.Record):
-        return decode_record(v)
-    elif isinstance(v, value_pb2.List):
-        return decode_list(v)
-    elif isinstance(v, value_pb2.Value):
-        return decode_value(v)
-    elif isinstance(v, event_pb2.Event):
-        return decode_event(v)
-    elif isinstance(v, transaction_pb2.Transaction):
-        return decode_transaction(v)
-    elif isinstance(v, command_service_pb2.SubmitAndWaitForTransactionResponse):
-        return decode(v.transaction)
-    elif isinstance(v, update_service_pb2.GetUpdatesResponse):
-        return decode_updates_response(v)
+def decode_transaction_lazy(v):
+    return {
+        "update_id": v.update_id,
+        "command_id": v.command_id,
+        "workflow_id": v.workflow_id,
+        "offset": v.offset,
+        "events": [decode_event_lazy(e) for e in v.events],
+    }
+
+
+def decode_updates_response_lazy(v):
+    if v.WhichOneof("update") == "transaction":
+        return decode_transaction_lazy(v.transaction)
     else:
+        return decode_updates_response(v)
+
+
+def _decode_transaction_response_lazy(v):
+    return decode_transaction_lazy(v.transaction)
+
+
+def _lazy_decoders():
+    return {
+        **_decoders(),
+        state_service_pb2.ActiveContract: ActiveContractView,
+        event_pb2.ArchivedEvent: ArchivedEventView,
+        event_pb2.CreatedEvent: CreatedEventView,
+        event_pb2.ExercisedEvent: ExercisedEventView,
+        event_pb2.Event: decode_event_lazy,
+        transaction_pb2.Transaction: decode_transaction_lazy,
+        command_service_pb2.SubmitAndWaitForTransactionResponse: _decode_transaction_response_lazy,
+        update_service_pb2.GetUpdatesResponse: decode_updates_response_lazy,
+        update_service_pb2.GetTransactionResponse: _decode_transaction_response_lazy,
+    }
+
+
+LAZY_DECODERS = MessageTable(_lazy_decoders)
+
+
+# As decode(), but events are returned as views that decode their fields
+# on access.
+def decode_lazy(v):
+    decoder = LAZY_DECODERS[type(v)]
+
+    if decoder is None:
         DECODE_FAIL(v)
+    else:
+        return decoder(v)
 
 
 ###